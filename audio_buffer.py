@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Bounded audio ring buffer for Voice To AI.
+
+A preallocated NumPy ring that the PyAudio callback writes into and the
+transcriber reads from. Memory stays flat for the whole session: only the
+last `capacity` samples are retained.
+
+The buffer is single-producer/single-consumer and lock-free. The producer
+copies samples in before publishing the new write position, and the
+consumer only reads up to the published position. Every sample is stored
+twice (at i and i + capacity) so any window up to `capacity` samples long
+is a contiguous slice and can be returned as a view without join/copy.
+Such a view is only valid until the producer wraps around onto it, so
+read_from() never hands out more than `capacity - margin` samples: the
+producer can write another `margin` samples before the consumer's view is
+touched. Anything older is counted as dropped.
+"""
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity, dtype=np.int16, margin=None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        # Headroom the producer keeps writing into while the consumer holds a view
+        self.margin = self.capacity // 4 if margin is None else min(int(margin), self.capacity - 1)
+        self._data = np.zeros(self.capacity * 2, dtype=self.dtype)
+        self.written = 0   # total samples ever written (published write position)
+        self.dropped = 0   # samples skipped because the consumer fell too far behind
+
+    @classmethod
+    def for_duration(cls, seconds, sample_rate, dtype=np.int16, margin=None):
+        return cls(int(seconds * sample_rate), dtype=dtype, margin=margin)
+
+    def write(self, samples):
+        """Producer side: copy samples (array or raw PCM bytes) into the ring"""
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=self.dtype)
+        n = len(samples)
+        written = self.written
+        if n > self.capacity:
+            # Only the tail fits; it lands where it would have after the rest
+            written += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        if n == 0:
+            return
+
+        start = written % self.capacity
+        first = min(n, self.capacity - start)
+        # Primary copy plus its mirror half so reads never wrap
+        self._data[start:start + first] = samples[:first]
+        self._data[start + self.capacity:start + self.capacity + first] = samples[:first]
+        if first < n:
+            rest = n - first
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity:self.capacity + rest] = samples[first:]
+        # Publish only after the data is in place
+        self.written = written + n
+
+    def oldest(self):
+        """Absolute position of the oldest sample still held"""
+        return max(0, self.written - self.capacity)
+
+    def view(self, start, end=None):
+        """Contiguous read-only view of samples in [start, end)"""
+        if end is None:
+            end = self.written
+        end = min(end, self.written)
+        start = max(start, self.oldest())
+        if end <= start:
+            return self._data[:0]
+        offset = start % self.capacity
+        view = self._data[offset:offset + (end - start)]
+        view.flags.writeable = False
+        return view
+
+    def read_from(self, position):
+        """Consumer side: return (samples since position, new position)
+
+        If the consumer fell more than `capacity - margin` samples behind,
+        the samples before that are counted in `dropped` and skipped, so the
+        returned view stays intact while the producer writes up to `margin`
+        more samples. Copy (or convert) the view before then.
+        """
+        samples, end, skipped = self.peek_from(position)
+        self.dropped += skipped
+        return samples, end
+
+    def peek_from(self, position):
+        """Like read_from, for an extra reader with its own cursor: returns
+        (samples, new position, samples skipped) and leaves `dropped` alone"""
+        end = self.written
+        oldest = max(0, end - (self.capacity - self.margin))
+        skipped = max(0, oldest - position)
+        return self.view(position + skipped, end), end, skipped
+
+    def __len__(self):
+        return min(self.written, self.capacity)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Input device management for Voice To AI.
+
+Each input device is probed once with PyAudio's is_format_supported for the
+sample rates the app can use, and the result is cached in voice_config.json
+keyed by a stable device identity (host API, name and channel count, not the
+PortAudio index, which changes when devices come and go, nor ALSA's
+"(hw:N,M)" suffix, whose card number follows plug order). Opening a stream
+then uses the best supported rate directly instead of trying rates until one
+works.
+
+PortAudio only sees new devices after it is re-initialized, which is only
+safe while no stream is open. The watcher thread does that when idle and,
+on Linux, only when /dev/snd changes, and reports changed device lists.
+"""
+
+import os
+import re
+import threading
+
+# Native 16 kHz first so resampling is skipped, then common rates
+PREFERRED_RATES = (16000, 48000, 44100, 32000, 22050, 8000)
+
+# ALSA appends the card/device numbers, e.g. "USB Audio Device: - (hw:2,0)"
+_ALSA_HW_SUFFIX = re.compile(r'\s*\(hw:\d+,\d+\)$')
+_ALSA_HW_IN_ID = re.compile(r'\s*\(hw:\d+,\d+\)(?=:)')
+
+
+class AudioDevice:
+    def __init__(self, index, device_id, name, rates):
+        self.index = index      # PortAudio index, valid until the next re-enumeration
+        self.id = device_id     # stable across restarts and hot-plug
+        self.name = name
+        self.rates = rates      # supported rates, best first
+        self.label = name       # menu text, made unique by DeviceManager
+
+    def __repr__(self):
+        return f"AudioDevice({self.index}, {self.id!r}, rates={self.rates})"
+
+
+def _hotplug_signature():
+    """Cheap change detector for sound devices, or None where unavailable"""
+    try:
+        return tuple(sorted(os.listdir('/dev/snd')))
+    except OSError:
+        return None
+
+
+class DeviceManager:
+    def __init__(self, cache=None, on_change=None, poll_seconds=5.0):
+        import pyaudio
+        self.pyaudio = pyaudio
+        self.audio = pyaudio.PyAudio()
+        self.cache = cache if cache is not None else {}  # device id -> {'rates': [...]}
+        self.on_change = on_change or (lambda devices: None)
+        self.poll_seconds = poll_seconds
+        self.busy = False  # a stream is open; PortAudio must not be re-initialized
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self.devices = self.enumerate()
+
+    def enumerate(self):
+        """Input devices with their supported rates (probing only uncached ones)"""
+        devices = []
+        seen = {}
+        with self._lock:
+            for i in range(self.audio.get_device_count()):
+                info = self.audio.get_device_info_by_index(i)
+                channels = info.get('maxInputChannels', 0)
+                if not isinstance(channels, (int, float)) or channels <= 0:
+                    continue
+                host_api = self.audio.get_host_api_info_by_index(info['hostApi'])['name']
+                name = _ALSA_HW_SUFFIX.sub('', info['name'])
+                base_id = f"{host_api}:{name}:{int(channels)}"
+                # Identical devices get an ordinal so they keep distinct ids
+                seen[base_id] = seen.get(base_id, 0) + 1
+                device_id = base_id if seen[base_id] == 1 else f"{base_id}#{seen[base_id]}"
+                cached = self.cache.get(device_id)
+                if cached is None:
+                    cached = self.cache[device_id] = {'rates': self._probe(i)}
+                devices.append(AudioDevice(i, device_id, info['name'], list(cached['rates'])))
+
+        names = {}
+        for device in devices:
+            names[device.name] = names.get(device.name, 0) + 1
+        counts = {}
+        for device in devices:
+            if names[device.name] > 1:
+                counts[device.name] = counts.get(device.name, 0) + 1
+                device.label = f"{device.name} ({counts[device.name]})"
+        return devices
+
+    def _probe(self, index):
+        rates = []
+        for rate in PREFERRED_RATES:
+            try:
+                if self.audio.is_format_supported(rate, input_device=index, input_channels=1,
+                                                  input_format=self.pyaudio.paInt16):
+                    rates.append(rate)
+            except ValueError:
+                pass
+        return rates
+
+    def find(self, device_id):
+        if device_id:
+            # Ids saved before the ALSA suffix was dropped still match
+            device_id = _ALSA_HW_IN_ID.sub('', device_id, count=1)
+        for device in self.devices:
+            if device.id == device_id:
+                return device
+        return None
+
+    def open_input(self, device, stream_callback, before_open=None, frames_per_buffer=1024):
+        """Open `device` at its best rate; returns (stream, rate)
+
+        before_open(rate) runs just before the stream exists, e.g. to size
+        buffers. If the cached rates turn out to be stale the device is
+        probed again.
+        """
+        with self._lock:
+            self.busy = True
+            rates = device.rates or list(PREFERRED_RATES)
+            for attempt in range(2):
+                for rate in rates:
+                    try:
+                        if before_open:
+                            before_open(rate)
+                        stream = self.audio.open(format=self.pyaudio.paInt16, channels=1, rate=rate, input=True,
+                                                 input_device_index=device.index,
+                                                 frames_per_buffer=frames_per_buffer,
+                                                 stream_callback=stream_callback)
+                        return stream, rate
+                    except (OSError, ValueError) as e:
+                        print(f"Failed to open {device.label} at {rate} Hz: {e}")
+                # Cached rates were wrong: probe again and retry once
+                rates = self.cache[device.id]['rates'] = device.rates = self._probe(device.index)
+                if not rates:
+                    break
+            self.busy = False
+            raise OSError(f"Could not open {device.label} at any supported sample rate")
+
+    def close_stream(self, stream):
+        with self._lock:
+            try:
+                stream.stop_stream()
+                stream.close()
+            finally:
+                self.busy = False
+
+    def start_watching(self):
+        threading.Thread(target=self._watch, daemon=True).start()
+        return self
+
+    def _watch(self):
+        signature = _hotplug_signature()
+        while not self._stopped.wait(self.poll_seconds):
+            current = _hotplug_signature()
+            if current is not None and current == signature:
+                continue
+            with self._lock:
+                if self.busy or self._stopped.is_set():
+                    continue
+                signature = current
+                self.rescan()
+
+    def rescan(self):
+        """Re-initialize PortAudio and report if the set of input devices changed"""
+        with self._lock:
+            if self.busy:
+                return False
+            self.audio.terminate()
+            self.audio = self.pyaudio.PyAudio()
+            old = [d.id for d in self.devices]
+            self.devices = self.enumerate()
+        changed = [d.id for d in self.devices] != old
+        if changed:
+            self.on_change(self.devices)
+        return changed
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            self.audio.terminate()
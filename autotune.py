@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Model and compute tier selection for Voice To AI.
+
+A tier is a Whisper model size, compute type, beam size and CPU thread
+count. The tuner walks a ladder of tiers from most to least accurate,
+measures each one's real-time factor (decode seconds per audio second) on a
+speech sample, and keeps the first that meets the target. The result is
+stored in voice_config.json under 'whisper_tier'. At runtime BacklogMonitor
+watches how far transcription lags behind capture and how busy the decoder
+is, and tells the app when to step down to the next tier. Inside the app
+the tuner runs in its own process (AutotuneProcess) so the GUI process only
+captures and displays.
+
+Usage:
+    python voice_app.py autotune --target-rtf 0.3
+    python autotune.py --help
+"""
+
+import argparse
+import collections
+import io
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+
+from transcription import TranscriptionEngine, TARGET_SAMPLE_RATE, prepare_audio, resolve_device
+
+CONFIG_FILE = 'voice_config.json'
+SAMPLE_TEXT = ("The quick brown fox jumps over the lazy dog. Please schedule the review for "
+               "Thursday afternoon and send the notes to everyone on the project.")
+
+# Most to least accurate; the tuner keeps the first tier that is fast enough
+LADDERS = {
+    'cpu': [('small', 'int8', 5), ('small', 'int8', 1), ('base', 'int8', 5),
+            ('base', 'int8', 1), ('tiny', 'int8', 1)],
+    'cuda': [('large-v3', 'float16', 5), ('medium', 'float16', 5), ('small', 'float16', 5),
+             ('base', 'float16', 5), ('base', 'int8_float16', 1)],
+}
+
+
+def make_tier(model_size, compute_type, beam_size=5, cpu_threads=0, device='cpu', rtf=None):
+    return {'model_size': model_size, 'compute_type': compute_type, 'beam_size': beam_size,
+            'cpu_threads': cpu_threads, 'device': device, 'rtf': rtf}
+
+
+def default_tier(device, compute_type, cpu_threads=0):
+    return make_tier('base', compute_type, 5, cpu_threads, device)
+
+
+def ladder(device, cpu_threads=0):
+    return [make_tier(m, c, b, cpu_threads, device) for m, c, b in LADDERS.get(device, LADDERS['cpu'])]
+
+
+def next_tier(tier):
+    """The next faster tier below `tier`, or None at the bottom or off the ladder"""
+    key = (tier['model_size'], tier['compute_type'], tier['beam_size'])
+    steps = ladder(tier['device'], tier.get('cpu_threads', 0))
+    for i, candidate in enumerate(steps):
+        if (candidate['model_size'], candidate['compute_type'], candidate['beam_size']) == key:
+            return steps[i + 1] if i + 1 < len(steps) else None
+    return None
+
+
+def sample_audio(path=None):
+    """16 kHz float32 speech to measure with: a WAV file, else espeak-ng output"""
+    from benchmark import load_wav
+    if path:
+        samples, rate = load_wav(path)
+    else:
+        from tts import EspeakBackend
+        backend = EspeakBackend()
+        if not backend.available():
+            raise RuntimeError("espeak-ng is needed to synthesize a sample; pass a WAV file instead")
+        samples, rate = load_wav(io.BytesIO(backend.synthesize(SAMPLE_TEXT).data))
+    return prepare_audio(samples, rate)
+
+
+def measure_rtf(engine, audio, beam_size, repeats=2):
+    """Best-of-N decode seconds per audio second for a loaded engine"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine.transcribe_words(audio, beam_size=beam_size)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (audio.size / TARGET_SAMPLE_RATE)
+
+
+def autotune(device=None, target_rtf=0.3, audio=None, thread_options=(0,), language='en', log=print):
+    """Return the most accurate tier whose real-time factor is at most target_rtf"""
+    if device is None:
+        device = resolve_device()[0]
+    if audio is None:
+        audio = sample_audio()
+    fallback = None
+    for threads in thread_options:
+        engines = {}
+        for tier in ladder(device, threads):
+            key = (tier['model_size'], tier['compute_type'])
+            if key not in engines:
+                # One load per model; beam sizes reuse it
+                engines.clear()
+                try:
+                    engines[key] = TranscriptionEngine(tier['model_size'], device=device,
+                                                       compute_type=tier['compute_type'], language=language,
+                                                       cpu_threads=threads).load()
+                except Exception as e:
+                    log(f"  {tier['model_size']}/{tier['compute_type']}: failed to load ({e})")
+                    engines[key] = None
+            if engines[key] is None:
+                continue
+            tier['rtf'] = measure_rtf(engines[key], audio, tier['beam_size'])
+            log(f"  {tier['model_size']}/{tier['compute_type']} beam {tier['beam_size']} "
+                f"threads {threads or 'auto'}: RTF {tier['rtf']:.3f}")
+            if fallback is None or tier['rtf'] < fallback['rtf']:
+                fallback = tier
+            if tier['rtf'] <= target_rtf:
+                return tier
+    # Nothing met the target; the fastest tier is the best we can do
+    return fallback
+
+
+def _autotune_main(device, target_rtf, thread_options, language, audio_path, results):
+    try:
+        tier = autotune(device, target_rtf, sample_audio(audio_path), thread_options, language)
+        results.put(('done', tier))
+    except Exception as e:
+        results.put(('error', f"{type(e).__name__}: {e}"))
+
+
+class AutotuneProcess:
+    """autotune() in a spawned process, cancellable if the app gets busy"""
+
+    def __init__(self, device, target_rtf=0.3, thread_options=(0,), language='en', audio_path=None):
+        ctx = mp.get_context('spawn')  # never fork the Tk process
+        self.results = ctx.Queue()
+        self.process = ctx.Process(target=_autotune_main, daemon=True,
+                                   args=(device, target_rtf, tuple(thread_options), language,
+                                         audio_path, self.results))
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def result(self, timeout=None):
+        """The chosen tier (None if nothing loaded); queue.Empty while still running"""
+        try:
+            status, value = self.results.get(timeout=timeout)
+        except queue.Empty:
+            if self.process.is_alive():
+                raise
+            try:
+                status, value = self.results.get_nowait()
+            except queue.Empty:
+                raise RuntimeError(f"autotune process exited with code {self.process.exitcode}") from None
+        self.process.join()
+        if status == 'error':
+            raise RuntimeError(value)
+        return value
+
+    def cancel(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+
+class BacklogMonitor:
+    """Signals when transcription can no longer keep up with capture
+
+    update() is called once per poll with the seconds of audio waiting and,
+    optionally, the pipeline's running totals of decode time and audio
+    seconds. It returns True once the backlog has stayed above
+    `limit_seconds` for `patience` consecutive polls, or when decoding took
+    more than `max_rtf` seconds per audio second over the last
+    `window_seconds` of audio. The poll drains the whole backlog, so a slow
+    model shows up as a backlog that stays high (about one decode's wall
+    time) or a decoder that is busy nearly all the time, not as one that
+    keeps growing.
+    """
+
+    def __init__(self, limit_seconds=3.0, patience=5, max_rtf=0.8, window_seconds=10.0):
+        self.limit_seconds = limit_seconds
+        self.patience = patience
+        self.max_rtf = max_rtf
+        self.window_seconds = window_seconds
+        self.reset()
+
+    def reset(self):
+        self.over = 0
+        self.history = collections.deque()  # (audio_seconds, decode_seconds) totals per poll
+
+    def update(self, backlog_seconds, decode_seconds=None, audio_seconds=None):
+        self.over = self.over + 1 if backlog_seconds > self.limit_seconds else 0
+        slow = False
+        if decode_seconds is not None and audio_seconds is not None:
+            self.history.append((audio_seconds, decode_seconds))
+            # Keep the oldest point that still spans the window
+            while len(self.history) > 1 and audio_seconds - self.history[1][0] >= self.window_seconds:
+                self.history.popleft()
+            first_audio, first_decode = self.history[0]
+            span = audio_seconds - first_audio
+            slow = span >= self.window_seconds and (decode_seconds - first_decode) / span > self.max_rtf
+        if self.over >= self.patience or slow:
+            self.reset()
+            return True
+        return False
+
+
+def save_tier(tier, config_file=CONFIG_FILE):
+    """Store the tier in the config file, keeping the other settings"""
+    config = {}
+    if os.path.exists(config_file):
+        try:
+            with open(config_file) as f:
+                config = json.load(f)
+        except ValueError:
+            pass
+    config['whisper_tier'] = dict(tier, tuned_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+    with open(config_file, 'w') as f:
+        json.dump(config, f)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="voice_app.py autotune",
+                                     description="Pick the most accurate Whisper tier that keeps up in real time")
+    parser.add_argument('--target-rtf', type=float, default=0.3,
+                        help="maximum decode seconds per audio second (leave headroom for re-decoding)")
+    parser.add_argument('--device', default=None, help="cpu or cuda (default: auto)")
+    parser.add_argument('--cpu-threads', type=int, nargs='+', default=[0],
+                        help="thread counts to try, in order of preference (0 = auto)")
+    parser.add_argument('--audio', default=None, help="16-bit WAV to measure with (default: espeak-ng sample)")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--config', default=CONFIG_FILE)
+    parser.add_argument('--dry-run', action='store_true', help="report the choice without saving it")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    device = resolve_device(args.device)[0]
+    print(f"Tuning on {device} for RTF <= {args.target_rtf}")
+    tier = autotune(device, args.target_rtf, sample_audio(args.audio), args.cpu_threads, args.language)
+    if tier is None:
+        print("No model could be loaded", file=sys.stderr)
+        return 1
+    print(f"Selected {tier['model_size']}/{tier['compute_type']} beam {tier['beam_size']} "
+          f"(RTF {tier['rtf']:.3f})")
+    if not args.dry_run:
+        save_tier(tier, args.config)
+        print(f"Saved to {args.config}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Batch file transcription for Voice To AI.
+
+Transcribes recorded audio files headlessly with the same Faster Whisper
+settings as the GUI. Files are sharded across a process pool where each
+worker holds one loaded model. Results are appended to a JSONL file as they
+finish (one line per file with segments and timestamps), optional SRT/VTT
+subtitles are written next to them, and files already in the JSONL are
+skipped so an interrupted run can be resumed.
+
+Usage:
+    python voice_app.py batch recordings/ talk.flac --workers 4 --srt
+    python batch_transcribe.py --help
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from transcription import TranscriptionEngine, resolve_device
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3', '.ogg', '.m4a', '.opus')
+
+_engine = None  # one model per pool worker
+_load_error = None  # why this worker has no model
+
+
+def collect_files(paths, extensions=AUDIO_EXTENSIONS):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.lower().endswith(extensions):
+                        files.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"Skipping missing path: {path}", file=sys.stderr)
+    return [os.path.abspath(f) for f in files]
+
+
+def completed_files(jsonl_path):
+    """Files that already have a successful record in the JSONL output"""
+    done = set()
+    if not os.path.exists(jsonl_path):
+        return done
+    with open(jsonl_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partial line from an interrupted run
+            if 'error' not in record:
+                done.add(record['file'])
+    return done
+
+
+def format_timestamp(seconds, separator):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def to_srt(segments):
+    blocks = []
+    for i, segment in enumerate(segments, 1):
+        blocks.append(f"{i}\n{format_timestamp(segment['start'], ',')} --> "
+                      f"{format_timestamp(segment['end'], ',')}\n{segment['text'].strip()}\n")
+    return "\n".join(blocks)
+
+
+def to_vtt(segments):
+    blocks = ["WEBVTT\n"]
+    for segment in segments:
+        blocks.append(f"{format_timestamp(segment['start'], '.')} --> "
+                      f"{format_timestamp(segment['end'], '.')}\n{segment['text'].strip()}\n")
+    return "\n".join(blocks)
+
+
+def subtitle_path(audio_path, subtitle_dir, extension):
+    stem = os.path.splitext(os.path.basename(audio_path))[0]
+    directory = subtitle_dir or os.path.dirname(audio_path)
+    return os.path.join(directory, f"{stem}.{extension}")
+
+
+class ModelLoadError(RuntimeError):
+    """A worker process could not load the model"""
+
+
+def _init_worker(settings):
+    global _engine, _load_error
+    try:
+        _engine = TranscriptionEngine(**settings).load(warmup=False)
+    except Exception as e:
+        # An initializer exception only breaks the pool; report it with the first file instead
+        _engine, _load_error = None, f"{type(e).__name__}: {e}"
+
+
+def _transcribe_file(path, options):
+    if _engine is None:
+        raise ModelLoadError(_load_error)
+    start = time.perf_counter()
+    try:
+        segments, info = _engine.transcribe_file(path, **options)
+    except Exception as e:
+        return {'file': path, 'error': f"{type(e).__name__}: {e}"}
+    return {
+        'file': path,
+        'duration': info.duration,
+        'language': info.language,
+        'processing_seconds': time.perf_counter() - start,
+        'text': " ".join(segment['text'].strip() for segment in segments),
+        'segments': segments,
+    }
+
+
+def run_batch(files, output, settings, options, workers=1, srt=False, vtt=False, subtitle_dir=None):
+    done = completed_files(output)
+    pending = [f for f in files if f not in done]
+    print(f"{len(files)} files, {len(files) - len(pending)} already done, {len(pending)} to transcribe "
+          f"with {workers} worker(s)")
+    if subtitle_dir:
+        os.makedirs(subtitle_dir, exist_ok=True)
+
+    totals = {'files': 0, 'failed': 0, 'audio_seconds': 0.0, 'processing_seconds': 0.0}
+    wall_start = time.perf_counter()
+    ctx = mp.get_context('spawn')
+    with open(output, 'a') as out, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                initializer=_init_worker, initargs=(settings,)) as pool:
+        futures = [pool.submit(_transcribe_file, path, options) for path in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            if 'error' in record:
+                totals['failed'] += 1
+                print(f"FAILED {record['file']}: {record['error']}", file=sys.stderr)
+                continue
+
+            totals['files'] += 1
+            totals['audio_seconds'] += record['duration']
+            totals['processing_seconds'] += record['processing_seconds']
+            if srt:
+                with open(subtitle_path(record['file'], subtitle_dir, 'srt'), 'w') as f:
+                    f.write(to_srt(record['segments']))
+            if vtt:
+                with open(subtitle_path(record['file'], subtitle_dir, 'vtt'), 'w') as f:
+                    f.write(to_vtt(record['segments']))
+            print(f"[{totals['files'] + totals['failed']}/{len(pending)}] {record['file']} "
+                  f"({record['duration']:.1f}s audio in {record['processing_seconds']:.1f}s)")
+
+    wall = time.perf_counter() - wall_start
+    totals['wall_seconds'] = wall
+    if totals['audio_seconds'] and wall:
+        totals['real_time_factor'] = wall / totals['audio_seconds']
+        totals['files_per_hour'] = totals['files'] / wall * 3600
+        totals['audio_hours_per_wall_hour'] = totals['audio_seconds'] / wall
+        print(f"Done: {totals['files']} files, {totals['failed']} failed, "
+              f"{totals['audio_seconds'] / 3600:.2f} audio-hours in {wall:.1f}s wall")
+        print(f"Aggregate RTF {totals['real_time_factor']:.3f}, "
+              f"{totals['files_per_hour']:.0f} files/hour, "
+              f"{totals['audio_hours_per_wall_hour']:.1f} audio-hours per wall-hour")
+    return totals
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="voice_app.py batch",
+                                     description="Transcribe audio files with Faster Whisper")
+    parser.add_argument('paths', nargs='+', help="audio files or directories (searched recursively)")
+    parser.add_argument('-o', '--output', default='transcripts.jsonl', help="JSONL results file (appended, used to resume)")
+    parser.add_argument('--model', default='base', help="Whisper model size")
+    parser.add_argument('--device', default=None, help="cpu or cuda (default: auto)")
+    parser.add_argument('--compute-type', default=None, help="e.g. int8, float16 (default: by device)")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--beam-size', type=int, default=5)
+    parser.add_argument('--vad-filter', action='store_true', help="use faster-whisper's Silero VAD")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="worker processes, one model each")
+    parser.add_argument('--cpu-threads', type=int, default=0,
+                        help="threads per worker (default: CPU count / workers)")
+    parser.add_argument('--srt', action='store_true', help="write an .srt next to each file")
+    parser.add_argument('--vtt', action='store_true', help="write a .vtt next to each file")
+    parser.add_argument('--subtitle-dir', default=None, help="write subtitles here instead")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    device, compute_type = resolve_device(args.device, args.compute_type)
+    workers = max(1, args.workers)
+    cpu_threads = args.cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+
+    files = collect_files(args.paths)
+    if not files:
+        print("No audio files found", file=sys.stderr)
+        return 1
+    settings = {
+        'model_size': args.model,
+        'device': device,
+        'compute_type': compute_type,
+        'language': args.language,
+        'vad_filter': args.vad_filter,
+        'cpu_threads': cpu_threads,
+    }
+    options = {'beam_size': args.beam_size}
+    try:
+        totals = run_batch(files, args.output, settings, options, workers=workers,
+                           srt=args.srt, vtt=args.vtt, subtitle_dir=args.subtitle_dir)
+    except ModelLoadError as e:
+        print(f"Could not load the {args.model} model: {e}", file=sys.stderr)
+        return 1
+    except BrokenProcessPool as e:
+        print(f"A worker process died: {e}", file=sys.stderr)
+        return 1
+    return 1 if totals['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
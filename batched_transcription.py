@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Batched multi-session inference for Voice To AI.
+
+Several dictation streams (network sessions, extra microphones) can share
+one loaded model. Each stream decodes through a BatchedSession that looks
+like a TranscriptionEngine; the BatchedTranscriber collects their pending
+windows into micro-batches (up to `max_batch_size`, waiting at most
+`max_wait` seconds after the first request) and decodes each batch in one
+call to faster-whisper's BatchedInferencePipeline.
+
+The windows are laid end to end in one buffer and passed as clip
+timestamps, each padded to the same length so faster-whisper never merges
+two streams into one 30 s chunk. Words are mapped back to their stream by
+time. Prompts differ per stream and cannot be shared within a batch, so
+batched decodes run without `initial_prompt`; a lone request is decoded
+normally with its prompt.
+"""
+
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+import metrics
+from transcription import TARGET_SAMPLE_RATE, prepare_audio
+
+MAX_CLIP_SECONDS = 30  # Whisper's window; longer audio is decoded on its own
+
+
+class BatchedTranscriber:
+    def __init__(self, engine, max_batch_size=8, max_wait=0.05, beam_size=5):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.beam_size = beam_size
+        self.pipeline = None
+        self.batches = 0
+        self.batched_requests = 0
+        self.requests = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def session(self):
+        """Engine-like handle for one stream, for StreamingTranscriber/DictationPipeline"""
+        return BatchedSession(self)
+
+    def submit(self, audio, initial_prompt=None):
+        future = Future()
+        self.requests.put((audio, initial_prompt, future))
+        return future
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.engine.ready.wait()
+            # Audio too long for one clip is decoded on its own
+            limit = MAX_CLIP_SECONDS * TARGET_SAMPLE_RATE
+            single = [r for r in batch if r[0].size > limit]
+            batch = [r for r in batch if r[0].size <= limit]
+            if len(batch) == 1:
+                single += batch
+                batch = []
+            for audio, prompt, future in single:
+                self._resolve(future, lambda: self.engine.transcribe_words(audio, initial_prompt=prompt))
+            if batch:
+                try:
+                    results = self._decode_batch([r[0] for r in batch])
+                except Exception as e:
+                    for _, _, future in batch:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), words in zip(batch, results):
+                    future.set_result(words)
+
+    def _resolve(self, future, fn):
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+
+    def _decode_batch(self, audios):
+        """Decode several windows in one batched call; returns one word list per window"""
+        if self.pipeline is None:
+            from faster_whisper import BatchedInferencePipeline
+            self.pipeline = BatchedInferencePipeline(model=self.engine.model)
+
+        # Pad every clip to the same whole-second length, which is also the
+        # chunk length, so no two clips fit in one chunk
+        clip_seconds = max(1, math.ceil(max(a.size for a in audios) / TARGET_SAMPLE_RATE))
+        clip_samples = clip_seconds * TARGET_SAMPLE_RATE
+        buffer = np.zeros(clip_samples * len(audios), dtype=np.float32)
+        clips = []
+        for i, audio in enumerate(audios):
+            start = i * clip_samples
+            buffer[start:start + audio.size] = audio
+            clips.append({'start': start, 'end': start + clip_samples})
+
+        with metrics.timer('batch_decode'):
+            segments, info = self.pipeline.transcribe(buffer, language=self.engine.language,
+                                                      vad_filter=False, clip_timestamps=clips,
+                                                      chunk_length=clip_seconds, batch_size=len(audios),
+                                                      beam_size=self.beam_size, word_timestamps=True)
+            results = [[] for _ in audios]
+            for segment in segments:
+                for word in segment.words or []:
+                    index = min(int((word.start + word.end) / 2 / clip_seconds), len(audios) - 1)
+                    offset = index * clip_seconds
+                    results[index].append((word.start - offset, word.end - offset, word.word))
+        self.batches += 1
+        self.batched_requests += len(audios)
+        metrics.observe_size('batch_size', len(audios))
+        return results
+
+
+class BatchedSession:
+    """Per-stream stand-in for TranscriptionEngine that decodes through the batcher"""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.engine = batcher.engine
+
+    @property
+    def ready(self):
+        return self.engine.ready
+
+    @property
+    def load_error(self):
+        return self.engine.load_error
+
+    def prepare_audio(self, pcm, sample_rate, resampler=None):
+        return prepare_audio(pcm, sample_rate, resampler)
+
+    def transcribe_words(self, audio, initial_prompt=None, **options):
+        if not audio.size:
+            return []
+        return self.batcher.submit(audio, initial_prompt).result()
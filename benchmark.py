@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Latency/throughput benchmark for the Voice To AI dictation pipeline.
+
+Replays fixture WAV files through a file-backed stand-in for pyaudio.PyAudio
+and runs the same capture -> resample -> VAD -> transcribe pipeline the GUI
+uses, without Tk or a real microphone. For every combination of model size,
+compute type and chunk (stream step) duration it reports real-time factor,
+time to first word, end-of-utterance latency, peak RSS and CPU time per
+second of audio, plus word error rate when a reference transcript
+(`name.txt` next to `name.wav`) exists. Each model and compute type runs in
+its own process, so peak RSS covers that configuration only.
+
+Results are written as JSON so runs can be compared between commits:
+
+    python benchmark.py fixtures/ --models tiny base --steps 0.5 1 2 -o before.json
+    python benchmark.py fixtures/ --models tiny base --steps 0.5 1 2 -o after.json --compare before.json
+
+--speed 1 (the default) replays in real time, which is what the latency
+numbers assume. --speed 0 feeds audio in lockstep with transcription as
+fast as possible, for throughput runs.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+from pipeline import DictationPipeline
+from resampler import resample_to
+from transcription import TranscriptionEngine, resolve_device
+
+PA_INT16 = 8  # pyaudio.paInt16
+
+
+def load_wav(path):
+    """Read a 16-bit PCM WAV file as mono int16 samples and its rate"""
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV fixtures are supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+class FakeInputStream:
+    """Replays int16 samples through a PyAudio-style stream callback"""
+
+    def __init__(self, samples, rate, frames_per_buffer, stream_callback, speed=1.0):
+        self.samples = samples
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = stream_callback
+        self.speed = speed
+        self.position = 0
+        self._active = False
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self.position >= self.samples.size
+
+    def _deliver(self, frames):
+        chunk = self.samples[self.position:self.position + frames]
+        self.position += chunk.size
+        if chunk.size:
+            self.callback(chunk.tobytes(), chunk.size, {}, 0)
+
+    def pump(self, seconds):
+        """Lockstep mode: deliver the next `seconds` of audio immediately"""
+        remaining = int(seconds * self.rate)
+        while remaining > 0 and not self.finished:
+            frames = min(self.frames_per_buffer, remaining)
+            self._deliver(frames)
+            remaining -= frames
+
+    def _run(self):
+        interval = self.frames_per_buffer / self.rate / self.speed
+        next_time = time.monotonic()
+        while self._active and not self.finished:
+            self._deliver(self.frames_per_buffer)
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.monotonic()))
+
+    def start_stream(self):
+        self._active = True
+        if self.speed:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop_stream(self):
+        self._active = False
+        if self._thread:
+            self._thread.join()
+
+    def is_active(self):
+        return self._active and not self.finished
+
+    def close(self):
+        self.stop_stream()
+
+
+class FakePyAudio:
+    """File-backed stand-in for pyaudio.PyAudio with one fake input device.
+
+    The fixture is resampled to whatever rate the caller opens, as if the
+    device supported every rate natively.
+    """
+
+    def __init__(self, wav_path, speed=1.0):
+        self.wav_path = wav_path
+        self.speed = speed
+        self.samples, self.native_rate = load_wav(wav_path)
+
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, index):
+        return {'index': 0, 'name': f"Fake microphone ({os.path.basename(self.wav_path)})",
+                'hostApi': 0, 'maxInputChannels': 1, 'defaultSampleRate': float(self.native_rate)}
+
+    def get_host_api_info_by_index(self, index):
+        return {'index': 0, 'name': 'Fake', 'deviceCount': 1, 'defaultInputDevice': 0}
+
+    def is_format_supported(self, rate, input_device=None, input_channels=None, input_format=None, **kwargs):
+        return True
+
+    def open(self, format=PA_INT16, channels=1, rate=16000, input=True, input_device_index=None,
+             frames_per_buffer=1024, stream_callback=None, start=False, **kwargs):
+        samples = self.samples
+        if rate != self.native_rate:
+            audio = resample_to(samples.astype(np.float32) / 32768.0, self.native_rate, rate)
+            samples = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        stream = FakeInputStream(samples, rate, frames_per_buffer, stream_callback, self.speed)
+        if start:
+            stream.start_stream()
+        return stream
+
+    def terminate(self):
+        pass
+
+
+@contextlib.contextmanager
+def fake_microphone(wav_path, speed=1.0):
+    """Swap pyaudio.PyAudio for FakePyAudio, e.g. to drive VoiceApp itself"""
+    import pyaudio
+    original = pyaudio.PyAudio
+    pyaudio.PyAudio = lambda: FakePyAudio(wav_path, speed)
+    try:
+        yield
+    finally:
+        pyaudio.PyAudio = original
+
+
+def _words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def peak_rss_mb():
+    # High-water mark of the whole process; see benchmark_model
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def run_session(engine, config, wav_path, capture_rate=48000, speed=1.0, poll_interval=0.1):
+    """Replay one fixture through the dictation pipeline and measure it"""
+    audio = FakePyAudio(wav_path, speed)
+    pipeline = DictationPipeline(engine, config)
+    pipeline.start(capture_rate)
+    stream = audio.open(format=PA_INT16, channels=1, rate=capture_rate, input=True,
+                        frames_per_buffer=1024, stream_callback=pipeline.capture_callback)
+    audio_seconds = stream.samples.size / capture_rate
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    stream.start_stream()
+    while not stream.finished:
+        if speed:
+            time.sleep(poll_interval / speed)
+        else:
+            stream.pump(poll_interval)
+        pipeline.poll()
+    stream.stop_stream()
+    stats = pipeline.finish()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    stream.close()
+
+    latencies = stats['end_of_utterance_latencies']
+    result = {
+        'fixture': os.path.basename(wav_path),
+        'audio_seconds': audio_seconds,
+        'wall_seconds': wall,
+        'real_time_factor': stats['decode_seconds'] / audio_seconds,
+        'wall_real_time_factor': wall / audio_seconds,
+        'time_to_first_word': stats['time_to_first_partial'],
+        'time_to_first_commit': stats['time_to_first_commit'],
+        'end_of_utterance_latency_mean': float(np.mean(latencies)) if latencies else None,
+        'end_of_utterance_latency_p95': float(np.percentile(latencies, 95)) if latencies else None,
+        'cpu_seconds_per_audio_second': cpu / audio_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'dropped_samples': stats['dropped_samples'],
+        'text': pipeline.text.strip(),
+    }
+    reference_path = os.path.splitext(wav_path)[0] + '.txt'
+    if os.path.exists(reference_path):
+        with open(reference_path) as f:
+            result['word_error_rate'] = word_error_rate(f.read(), result['text'])
+    return result
+
+
+def benchmark_model(model, compute_type, device, cpu_threads, steps, vad, fixtures, capture_rate, speed):
+    """Load one model and run every step over every fixture; returns (load_seconds, {step: runs})
+
+    main() calls this in a fresh process per configuration, since ru_maxrss
+    would otherwise carry the peak of every model loaded before it.
+    """
+    engine = TranscriptionEngine(model, device=device, compute_type=compute_type,
+                                 cpu_threads=cpu_threads).load(warmup=True)
+    results = {}
+    for step in steps:
+        config = {'stream_step_seconds': step, 'vad': vad}
+        results[step] = [run_session(engine, config, f, capture_rate, speed) for f in fixtures]
+    return engine.load_seconds, results
+
+
+def summarize(runs):
+    """Average numeric metrics over fixtures (ignoring missing values)"""
+    summary = {}
+    for key in runs[0]:
+        values = [r.get(key) for r in runs if isinstance(r.get(key), (int, float))]
+        if values and key not in ('peak_rss_mb',):
+            summary[key] = float(np.mean(values))
+    summary['peak_rss_mb'] = max(r['peak_rss_mb'] for r in runs)
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+COMPARE_KEYS = ('real_time_factor', 'time_to_first_word', 'end_of_utterance_latency_mean',
+                'cpu_seconds_per_audio_second', 'peak_rss_mb', 'word_error_rate')
+
+
+def compare(baseline_path, report):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r['model'], r['compute_type'], r['step_seconds']): r['summary'] for r in baseline['results']}
+    print(f"\nComparison against {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for result in report['results']:
+        key = (result['model'], result['compute_type'], result['step_seconds'])
+        if key not in old:
+            continue
+        print(f"  {key[0]}/{key[1]}/step {key[2]}s")
+        for metric in COMPARE_KEYS:
+            before, after = old[key].get(metric), result['summary'].get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"    {metric:32} {before:10.3f} -> {after:10.3f} ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dictation pipeline with fixture WAVs")
+    parser.add_argument('fixtures', nargs='+', help="WAV files or directories of WAV fixtures")
+    parser.add_argument('--models', nargs='+', default=['tiny', 'base', 'small'])
+    parser.add_argument('--compute-types', nargs='+', default=None,
+                        help="default: int8 on CPU, float16 on CUDA")
+    parser.add_argument('--steps', nargs='+', type=float, default=[1.0],
+                        help="stream step (chunk) durations in seconds")
+    parser.add_argument('--device', default=None, help="cpu or cuda (default: auto)")
+    parser.add_argument('--capture-rate', type=int, default=48000, help="rate the fake microphone is opened at")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed; 0 = as fast as possible")
+    parser.add_argument('--no-vad', action='store_true', help="disable the energy VAD")
+    parser.add_argument('--cpu-threads', type=int, default=0)
+    parser.add_argument('-o', '--output', default='benchmark.json')
+    parser.add_argument('--compare', default=None, help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    fixtures = []
+    for path in args.fixtures:
+        if os.path.isdir(path):
+            fixtures += sorted(os.path.join(path, n) for n in os.listdir(path) if n.lower().endswith('.wav'))
+        else:
+            fixtures.append(path)
+    if not fixtures:
+        print("No WAV fixtures found", file=sys.stderr)
+        return 1
+
+    device, compute_type = resolve_device(args.device)
+    compute_types = args.compute_types or [compute_type]
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'device': device,
+            'capture_rate': args.capture_rate,
+            'speed': args.speed,
+            'vad': not args.no_vad,
+            'fixtures': [os.path.basename(f) for f in fixtures],
+        },
+        'results': [],
+    }
+
+    ctx = mp.get_context('spawn')
+    for model in args.models:
+        for compute_type in compute_types:
+            with ctx.Pool(1) as pool:
+                load_seconds, by_step = pool.apply(benchmark_model, (
+                    model, compute_type, device, args.cpu_threads, args.steps, not args.no_vad,
+                    fixtures, args.capture_rate, args.speed))
+            for step in args.steps:
+                runs = by_step[step]
+                summary = summarize(runs)
+                report['results'].append({'model': model, 'compute_type': compute_type, 'step_seconds': step,
+                                          'load_seconds': load_seconds, 'summary': summary, 'runs': runs})
+                wer = summary.get('word_error_rate')
+                print(f"{model:>8} {compute_type:>8} step {step:>4}s  RTF {summary['real_time_factor']:.3f}  "
+                      f"TTFW {summary.get('time_to_first_word', float('nan')):.2f}s  "
+                      f"EOU {summary.get('end_of_utterance_latency_mean', float('nan')):.2f}s  "
+                      f"CPU/s {summary['cpu_seconds_per_audio_second']:.2f}  "
+                      f"RSS {summary['peak_rss_mb']:.0f}MB" + (f"  WER {wer:.1%}" if wer is not None else ""))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    if args.compare:
+        compare(args.compare, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: CPU time per second of audio for resampling to 16 kHz.
+
+Compares the old per-chunk FFT resample (scipy.signal.resample on every
+2 s chunk) with the streaming polyphase resampler fed at listen_loop's
+100 ms polling cadence, for each capture rate listen_loop may open.
+
+The chunking error of each method is its RMS difference from the same
+method applied to the whole signal at once (FFT vs whole-signal FFT, poly
+vs whole-signal resample_poly), so it isolates chunk-edge effects. The two
+filters also differ from each other; that difference is reported
+separately and is not a chunking artefact.
+
+Usage: python benchmark_resample.py [seconds_of_audio]
+"""
+
+import sys
+import time
+
+import numpy as np
+from scipy.signal import resample, resample_poly
+
+from resampler import StreamingResampler
+
+RATES = [48000, 44100, 32000, 22050, 8000]
+
+
+def fft_per_chunk(audio, rate, chunk_seconds=2):
+    chunk = int(rate * chunk_seconds)
+    out = []
+    for i in range(0, audio.size, chunk):
+        part = audio[i:i + chunk]
+        out.append(resample(part, int(part.size * 16000 / rate)).astype(np.float32))
+    return np.concatenate(out)
+
+
+def streaming_poly(audio, rate, poll_seconds=0.1):
+    resampler = StreamingResampler(rate)
+    step = int(rate * poll_seconds)
+    out = [resampler.process(audio[i:i + step]) for i in range(0, audio.size, step)]
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+
+def fft_whole(audio, rate):
+    return resample(audio, int(audio.size * 16000 / rate)).astype(np.float32)
+
+
+def poly_whole(audio, rate):
+    return resample_poly(audio, 16000, rate).astype(np.float32)
+
+
+def rms_error(result, reference):
+    n = min(result.size, reference.size)
+    return float(np.sqrt(np.mean((result[:n] - reference[:n]) ** 2)))
+
+
+def cpu_seconds(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(*args)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rng = np.random.default_rng(0)
+    print("CPU ms per second of audio; chunking error vs the same method on the whole signal")
+    print(f"{'rate':>7} {'fft/chunk ms':>13} {'poly stream ms':>15} {'fft chunk err':>14} "
+          f"{'poly chunk err':>15} {'fft vs poly':>12}")
+    for rate in RATES:
+        # Band-limited test tone plus noise so the error is not dominated by aliasing
+        t = np.arange(int(rate * seconds)) / rate
+        audio = (0.3 * np.sin(2 * np.pi * 440 * t) + rng.standard_normal(t.size) * 0.01).astype(np.float32)
+        fft = cpu_seconds(fft_per_chunk, audio, rate) / seconds * 1000
+        poly = cpu_seconds(streaming_poly, audio, rate) / seconds * 1000
+        fft_ref, poly_ref = fft_whole(audio, rate), poly_whole(audio, rate)
+        fft_err = rms_error(fft_per_chunk(audio, rate), fft_ref)
+        poly_err = rms_error(streaming_poly(audio, rate), poly_ref)
+        filter_diff = rms_error(fft_ref, poly_ref)
+        print(f"{rate:>7} {fft:>13.3f} {poly:>15.3f} {fft_err:>14.2e} {poly_err:>15.2e} {filter_diff:>12.2e}")
+    print("  16000  resampling skipped (native capture)")
+
+
+if __name__ == "__main__":
+    main()
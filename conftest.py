@@ -0,0 +1,2 @@
+# test_whisper.py is a manual check against a real model, not a pytest module
+collect_ignore = ['test_whisper.py']
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Stand-in Ollama server for Voice To AI.
+
+Implements the parts of the Ollama HTTP API the app uses (/api/tags and
+streaming or non-streaming /api/generate) with a canned reply. A model that
+is not resident pays a simulated load delay, and stays resident for its
+request's `keep_alive`, so warm-up and keep-alive behaviour can be checked
+offline. Every generate payload is kept in `requests` for inspection.
+
+Usage:
+    python fake_ollama.py --port 11434 --load-seconds 3
+    python fake_ollama.py --help
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = ("Sure. Here is a short answer to your question. "
+                 "It arrives one token at a time, just like the real server.")
+
+
+def parse_keep_alive(value, default=300.0):
+    """Seconds a model stays loaded; negative means forever"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r'(-?\d+(?:\.\d+)?)(ms|s|m|h)?', str(value).strip())
+    if not match:
+        return default
+    number, unit = float(match.group(1)), match.group(2) or 's'
+    return number * {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[unit]
+
+
+class FakeOllama:
+    def __init__(self, models=('llama3.2',), load_seconds=2.0, token_delay=0.02, reply=DEFAULT_REPLY):
+        self.models = list(models)
+        self.load_seconds = load_seconds
+        self.token_delay = token_delay
+        self.reply = reply
+        self.resident = {}  # model -> time it unloads
+        self.requests = []
+        self.loads = 0
+        self._lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host='127.0.0.1', port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if self.path == '/api/tags':
+                    self._json(200, {'models': [{'name': m} for m in fake.models]})
+                else:
+                    self._json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path != '/api/generate':
+                    self._json(404, {'error': 'not found'})
+                    return
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                fake.requests.append(payload)
+                model = payload.get('model')
+                if model not in fake.models:
+                    self._json(404, {'error': f"model '{model}' not found"})
+                    return
+                load_duration = fake._load(model, payload.get('keep_alive'))
+                if not payload.get('prompt'):
+                    self._json(200, {'model': model, 'response': '', 'done': True,
+                                     'load_duration': int(load_duration * 1e9)})
+                    return
+                tokens = re.findall(r'\S+\s*', fake.reply)
+                # Only the new prompt is evaluated; earlier turns come in through context
+                prompt_tokens = len(payload['prompt'].split())
+                context = list(payload.get('context') or []) + list(range(prompt_tokens + len(tokens)))
+                final = {'model': model, 'done': True, 'load_duration': int(load_duration * 1e9),
+                         'prompt_eval_count': prompt_tokens, 'eval_count': len(tokens),
+                         'eval_duration': int(len(tokens) * fake.token_delay * 1e9), 'context': context}
+                if payload.get('stream', True) is False:
+                    time.sleep(len(tokens) * fake.token_delay)
+                    self._json(200, dict(final, response=fake.reply))
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for token in tokens:
+                    time.sleep(fake.token_delay)
+                    self._chunk({'model': model, 'response': token, 'done': False})
+                self._chunk(dict(final, response=''))
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, body):
+                data = json.dumps(body).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def _load(self, model, keep_alive):
+        """Simulate loading if the model is not resident; returns the load time"""
+        with self._lock:
+            now = time.monotonic()
+            needs_load = self.resident.get(model, 0) <= now
+        if needs_load:
+            time.sleep(self.load_seconds)
+            self.loads += 1
+        seconds = parse_keep_alive(keep_alive)
+        with self._lock:
+            self.resident[model] = float('inf') if seconds < 0 else time.monotonic() + seconds
+        return self.load_seconds if needs_load else 0.0
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in Ollama server with simulated model loading")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--models', nargs='+', default=['llama3.2'])
+    parser.add_argument('--load-seconds', type=float, default=2.0, help="simulated cold model load time")
+    parser.add_argument('--token-delay', type=float, default=0.02, help="seconds between streamed tokens")
+    args = parser.parse_args(argv)
+    fake = FakeOllama(args.models, args.load_seconds, args.token_delay).start(args.host, args.port)
+    print(f"Fake Ollama serving {', '.join(args.models)} at {fake.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing instrumentation for Voice To AI.
+
+Stages call the module-level helpers:
+
+    with metrics.timer('transcribe'):
+        ...
+    metrics.observe_size('tts_sentence_queue', queue.qsize())
+    metrics.inc('dropped_samples', n)
+
+Until enable() is called these go to a null registry that does nothing, so
+instrumentation costs a function call when metrics are off. Once enabled,
+durations, queue depths and buffer sizes are kept as histograms, exposed in
+Prometheus text format on a localhost HTTP endpoint and/or written as
+periodic JSON snapshots to a rotating log file.
+"""
+
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = 'voice2text'
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, running = [], 0
+            for c in counts:
+                running += c
+                total.append(running)
+            return total, self.sum, self.count
+
+
+class _Timer:
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullRegistry:
+    enabled = False
+
+    def timer(self, stage):
+        return _NULL_TIMER
+
+    def observe(self, stage, seconds):
+        pass
+
+    def observe_size(self, name, value):
+        pass
+
+    def inc(self, name, amount=1):
+        pass
+
+
+class Registry:
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}    # stage -> Histogram of seconds
+        self.sizes = {}     # name -> Histogram of sizes
+        self.gauges = {}    # name -> last observed size
+        self.counters = {}  # name -> total
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, name, buckets):
+        histogram = table.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(name, Histogram(buckets))
+        return histogram
+
+    def timer(self, stage):
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        self._histogram(self.stages, stage, TIME_BUCKETS).observe(seconds)
+
+    def observe_size(self, name, value):
+        self._histogram(self.sizes, name, SIZE_BUCKETS).observe(value)
+        self.gauges[name] = value
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        family = f"{PREFIX}_stage_seconds"
+        lines.append(f"# HELP {family} Time spent in each pipeline stage")
+        lines.append(f"# TYPE {family} histogram")
+        for stage, histogram in sorted(self.stages.items()):
+            lines.extend(self._render_histogram(family, histogram, f'stage="{stage}"'))
+        for name, histogram in sorted(self.sizes.items()):
+            family = f"{PREFIX}_{name}"
+            lines.append(f"# TYPE {family} histogram")
+            lines.extend(self._render_histogram(family, histogram, ""))
+            lines.append(f"# TYPE {family}_current gauge")
+            lines.append(f"{family}_current {self.gauges.get(name, 0)}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            lines.append(f"{PREFIX}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, family, histogram, labels):
+        cumulative, total, count = histogram.cumulative()
+        sep = "," if labels else ""
+        bounds = [repr(float(b)) for b in histogram.buckets] + ["+Inf"]
+        lines = [f'{family}_bucket{{{labels}{sep}le="{b}"}} {c}' for b, c in zip(bounds, cumulative)]
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{family}_sum{suffix} {total}")
+        lines.append(f"{family}_count{suffix} {count}")
+        return lines
+
+    def snapshot(self):
+        """Summary for the JSON log: count/sum/mean per stage and size"""
+        def summarize(table):
+            result = {}
+            for name, histogram in table.items():
+                cumulative, total, count = histogram.cumulative()
+                result[name] = {'count': count, 'sum': total, 'mean': total / count if count else None}
+            return result
+        return {
+            'time': time.time(),
+            'stages': summarize(self.stages),
+            'sizes': summarize(self.sizes),
+            'gauges': dict(self.gauges),
+            'counters': dict(self.counters),
+        }
+
+
+_registry = NullRegistry()
+
+
+def timer(stage):
+    return _registry.timer(stage)
+
+
+def observe(stage, seconds):
+    _registry.observe(stage, seconds)
+
+
+def observe_size(name, value):
+    _registry.observe_size(name, value)
+
+
+def inc(name, amount=1):
+    _registry.inc(name, amount)
+
+
+def enabled():
+    return _registry.enabled
+
+
+def registry():
+    return _registry
+
+
+def _serve(registry, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the console
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _log_snapshots(registry, path, interval, max_bytes, backups):
+    logger = logging.getLogger(f"{PREFIX}.metrics")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups))
+
+    def run():
+        while True:
+            time.sleep(interval)
+            logger.info(json.dumps(registry.snapshot()))
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def enable(port=None, log_path=None, log_interval=10, log_max_bytes=1024 * 1024, log_backups=3):
+    """Switch to a recording registry; optionally serve it and log snapshots"""
+    global _registry
+    if not _registry.enabled:
+        _registry = Registry()
+    if port:
+        _serve(_registry, port)
+        print(f"Metrics at http://127.0.0.1:{port}/metrics")
+    if log_path:
+        _log_snapshots(_registry, log_path, log_interval, log_max_bytes, log_backups)
+    return _registry
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Ollama client for Voice To AI.
+
+Keeps one pooled HTTP session to the local Ollama server and streams
+generated tokens as they arrive, so the GUI can show and speak the response
+while the model is still generating. Requests carry a `keep_alive` so the
+model stays loaded between dictations, warm() loads a model ahead of the
+first prompt, and ModelDiscovery keeps the model list fresh in the
+background. Conversation carries Ollama's returned context from turn to
+turn so follow-up questions keep their history without re-sending it.
+"""
+
+import collections
+import json
+import re
+import threading
+
+import requests
+
+OLLAMA_URL = 'http://localhost:11434'
+DEFAULT_KEEP_ALIVE = '30m'  # Ollama's own default unloads after 5 minutes idle
+
+
+class OllamaError(Exception):
+    def __init__(self, status_code, message=""):
+        super().__init__(f"Ollama error: {status_code} {message}".strip())
+        self.status_code = status_code
+
+
+class OllamaClient:
+    def __init__(self, base_url=OLLAMA_URL, timeout=60, keep_alive=DEFAULT_KEEP_ALIVE):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.keep_alive = keep_alive  # duration string ("30m") or seconds; -1 keeps the model loaded
+        self.session = requests.Session()  # keeps the TCP connection alive between requests
+        self.last_stats = {}
+
+    def list_models(self, timeout=5):
+        response = self.session.get(f"{self.base_url}/api/tags", timeout=timeout)
+        if response.status_code != 200:
+            raise OllamaError(response.status_code)
+        return [model['name'] for model in response.json()['models']]
+
+    def generate_stream(self, model, prompt, **options):
+        """Yield response tokens from /api/generate as they are produced
+
+        The final chunk's statistics (eval counts and durations) are kept in
+        `last_stats`.
+        """
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        payload.update(options)
+        with self.session.post(f"{self.base_url}/api/generate", json=payload,
+                               stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise OllamaError(response.status_code, response.text[:100])
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    raise OllamaError(response.status_code, chunk['error'])
+                if chunk.get('response'):
+                    yield chunk['response']
+                if chunk.get('done'):
+                    self.last_stats = {k: v for k, v in chunk.items() if k != 'response'}
+                    break
+
+    def warm(self, model, keep_alive=None):
+        """Load `model` into memory without generating; returns Ollama's load_duration in seconds
+
+        An empty prompt makes Ollama load the model and return. For a model
+        that is already resident this is cheap and just renews its keep-alive.
+        """
+        payload = {"model": model, "prompt": "", "stream": False,
+                   "keep_alive": keep_alive if keep_alive is not None else self.keep_alive}
+        response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise OllamaError(response.status_code, response.text[:100])
+        return response.json().get('load_duration', 0) / 1e9
+
+    def close(self):
+        self.session.close()
+
+
+class Conversation:
+    """Multi-turn chat that reuses the context array /api/generate returns
+
+    Passing the previous turn's context back lets Ollama continue from its
+    cached state, so each turn only evaluates its own new tokens. Once the
+    context grows past `max_context_tokens` it is dropped and the next
+    prompt restates just the last `keep_turns` exchanges, which bounds both
+    memory and the one-off re-evaluation; only those exchanges are kept.
+
+    reset() may be called while ask() is still streaming (the lock is held
+    for the whole reply, so reset must not wait for it). Each reset starts a
+    new epoch, and a reply from an older epoch is not recorded.
+    """
+
+    def __init__(self, client, max_context_tokens=4096, keep_turns=3):
+        self.client = client
+        self.max_context_tokens = max_context_tokens
+        self.keep_turns = keep_turns
+        self.lock = threading.Lock()
+        self.epoch = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new conversation"""
+        self.epoch += 1
+        self.turns = collections.deque(maxlen=self.keep_turns)  # recent (user, assistant) text
+        self.turn_count = 0
+        self.context = None    # token state from the last reply
+        self.model = None
+
+    def _prompt(self, user_text):
+        if self.context is not None or not self.turns:
+            return user_text
+        # Context was dropped: restate the most recent exchanges once
+        recap = "\n".join(f"User: {u}\nAssistant: {a}" for u, a in self.turns)
+        return f"Earlier in this conversation:\n{recap}\n\n{user_text}"
+
+    def ask(self, model, user_text, **options):
+        """Yield response tokens for the next turn, then record it"""
+        with self.lock:
+            epoch = self.epoch
+            if model != self.model:
+                self.context = None  # context tokens belong to one model
+                self.model = model
+            if self.context is not None:
+                options['context'] = self.context
+            reply = ""
+            for token in self.client.generate_stream(model, self._prompt(user_text), **options):
+                reply += token
+                yield token
+            if epoch != self.epoch:
+                return  # "New conversation" was pressed mid-reply
+            stats = self.client.last_stats
+            self.turns.append((user_text, reply))
+            self.turn_count += 1
+            self.context = stats.get('context')
+            if self.context and len(self.context) > self.max_context_tokens:
+                self.context = None
+
+
+class ModelDiscovery:
+    """Polls the model list on a daemon thread and reports changes
+
+    on_change(models) is called from the polling thread with the new list
+    (empty when Ollama is unreachable) whenever it differs from the last one,
+    including the first successful or failed poll.
+    """
+
+    def __init__(self, client, on_change, interval=30):
+        self.client = client
+        self.on_change = on_change
+        self.interval = interval
+        self.models = None
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def refresh(self):
+        """Poll now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                models = self.client.list_models(timeout=5)
+            except (requests.RequestException, OllamaError, ValueError, KeyError):
+                models = []
+            if models != self.models:
+                self.models = models
+                self.on_change(models)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+class SentenceSplitter:
+    """Accumulate streamed tokens and hand back complete sentences"""
+
+    _boundary = re.compile(r'(?<=[.!?:;])\s+|\n+')
+
+    def __init__(self, min_chars=12):
+        self.min_chars = min_chars  # merge very short fragments ("Yes.", "e.g.") into the next one
+        self.buffer = ""
+
+    def feed(self, token):
+        self.buffer += token
+        sentences = []
+        start = 0
+        for match in self._boundary.finditer(self.buffer):
+            candidate = self.buffer[start:match.start()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest
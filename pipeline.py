@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Dictation pipeline for Voice To AI.
+
+Capture -> ring buffer -> resample -> VAD -> streaming transcription, with no
+GUI attached. VoiceApp drives it from its listen loop; the benchmark harness
+drives it from a fake microphone. Results are reported through callbacks.
+"""
+
+import bisect
+import time
+
+import metrics
+from audio_buffer import AudioRingBuffer
+from resampler import StreamingResampler
+from transcription import StreamingTranscriber, TARGET_SAMPLE_RATE
+from vad import EnergyVAD, UtteranceSegmenter
+
+PA_CONTINUE = 0  # same value as pyaudio.paContinue, without importing pyaudio
+
+
+class DictationPipeline:
+    def __init__(self, engine, config=None, on_text=None, on_error=None, on_engine_replaced=None):
+        config = config or {}
+        self.engine = engine
+        self.next_engine = None
+        self.on_engine_replaced = on_engine_replaced or (lambda old: None)
+        self.streamer = StreamingTranscriber(engine, window_seconds=config.get('stream_window_seconds', 15.0))
+        # Voice activity detection: only speech is sent to Whisper
+        self.segmenter = None
+        if config.get('vad', True):
+            self.segmenter = UtteranceSegmenter(EnergyVAD(threshold_db=config.get('vad_threshold_db', -45.0)),
+                                                silence_ms=config.get('vad_silence_ms', 500))
+        self.step_samples = int(config.get('stream_step_seconds', 1.0) * TARGET_SAMPLE_RATE)
+        self.buffer_seconds = config.get('buffer_seconds', 30)  # Retention window of captured audio
+        self.on_text = on_text or (lambda committed, partial: None)
+        self.on_error = on_error or (lambda e: print(f"Transcription error: {e}"))
+
+        self.audio_buffer = None
+        self.resampler = None
+        self.sample_rate = None
+        self.capturing = False
+        self.text = ""
+        self.backlog_seconds = 0.0
+        self.recorder = None  # optional SessionRecorder with its own cursor into the ring
+
+    def start(self, sample_rate):
+        """Prepare for a new capture session at the given device rate"""
+        self._apply_engine()
+        self.sample_rate = sample_rate
+        self.audio_buffer = AudioRingBuffer.for_duration(self.buffer_seconds, sample_rate)
+        self.resampler = StreamingResampler(sample_rate, TARGET_SAMPLE_RATE)
+        self.processed = 0
+        self.undecoded_samples = 0
+        self.samples_in = 0            # 16 kHz samples handed to the VAD
+        self.last_capture_time = None
+        self.eou_latencies = []
+        self.decode_seconds = 0.0
+        self.text = ""
+        self.recorded = 0              # ring position the recorder has written up to
+        # Streamer time -> capture time: where each piece handed to the
+        # streamer starts in both, since the VAD drops the silence between
+        self.skipped_seconds = 0.0     # capture the transcriber lost to ring overruns
+        self.streamed = 0
+        self.piece_stream_starts = []
+        self.piece_capture_starts = []
+        self.streamer.reset(started_at=time.monotonic())
+        if self.segmenter:
+            self.segmenter.reset()
+        self.capturing = True
+
+    def replace_engine(self, engine):
+        """Switch to another loaded engine before the next decode"""
+        self.next_engine = engine
+        if not self.capturing:
+            self._apply_engine()
+
+    def _apply_engine(self):
+        engine, self.next_engine = self.next_engine, None
+        if engine is not None:
+            old, self.engine = self.engine, engine
+            self.streamer.engine = engine
+            self.on_engine_replaced(old)
+
+    def write(self, in_data):
+        """Producer side: store captured PCM (called from the audio callback)"""
+        with metrics.timer('capture'):
+            self.audio_buffer.write(in_data)
+        self.last_capture_time = time.monotonic()
+
+    def capture_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio-compatible stream callback"""
+        if self.capturing:
+            self.write(in_data)
+        return (in_data, PA_CONTINUE)
+
+    def record(self):
+        """Copy newly captured audio to the recorder; call while the model
+        loads too, so nothing the transcriber later skips is lost"""
+        if not self.recorder or self.audio_buffer is None:
+            return
+        chunk, self.recorded, skipped = self.audio_buffer.peek_from(self.recorded)
+        if skipped:
+            self.recorder.write_silence(skipped)
+        if chunk.size:
+            self.recorder.write(chunk)
+
+    def poll(self):
+        """Consumer side: transcribe what was captured since the last poll"""
+        self._apply_engine()
+        self.record()
+        dropped = self.audio_buffer.dropped
+        backlog = self.audio_buffer.written - self.processed
+        self.backlog_seconds = backlog / self.sample_rate
+        metrics.observe_size('capture_backlog_samples', backlog)
+        chunk, self.processed = self.audio_buffer.read_from(self.processed)
+        if self.audio_buffer.dropped > dropped:
+            metrics.inc('dropped_samples', self.audio_buffer.dropped - dropped)
+            self.skipped_seconds += (self.audio_buffer.dropped - dropped) / self.sample_rate
+        if chunk.size:
+            try:
+                with metrics.timer('resample'):
+                    audio = self.engine.prepare_audio(chunk, self.sample_rate, self.resampler)
+            except Exception as e:
+                self.on_error(e)
+                return chunk.size
+            self.transcribe_audio(audio)
+        return chunk.size
+
+    def finish(self):
+        """Stop capturing, transcribe the tail and commit everything; returns stats"""
+        self.capturing = False
+        self.poll()
+        self.transcribe_audio(self.resampler.flush())
+        self._decode(self.streamer.flush)
+        return self.stats()
+
+    def transcribe_audio(self, audio):
+        """Gate 16 kHz audio through the VAD into the streamer"""
+        captured_at = self.last_capture_time
+        start = self.samples_in
+        self.samples_in += audio.size
+        try:
+            with metrics.timer('vad'):
+                pieces = self.segmenter.push(audio) if self.segmenter else [(audio, False, start)]
+            for speech, ended, start in pieces:
+                self.piece_stream_starts.append(self.streamed)
+                self.piece_capture_starts.append(start / TARGET_SAMPLE_RATE + self.skipped_seconds)
+                self.streamed += speech.size
+                self.streamer.insert_audio(speech)
+                self.undecoded_samples += speech.size
+                if ended:
+                    # Trailing silence: flush the utterance right away
+                    self._decode(self.streamer.flush)
+                    self.undecoded_samples = 0
+                    self._record_end_of_utterance(captured_at)
+                elif self.undecoded_samples >= self.step_samples:
+                    self._decode(self.streamer.process)
+                    self.undecoded_samples = 0
+        except Exception as e:
+            self.on_error(e)
+
+    def _decode(self, step):
+        metrics.observe_size('undecoded_samples', self.undecoded_samples)
+        committed_before = len(self.streamer.committed)
+        start = time.perf_counter()
+        result = step()
+        elapsed = time.perf_counter() - start
+        self.decode_seconds += elapsed
+        metrics.observe('transcribe', elapsed)
+        committed, partial = result if isinstance(result, tuple) else (result, "")
+        if committed:
+            self.text += committed + " "
+            words = self.streamer.committed[committed_before:]
+            if self.recorder and words:
+                self.recorder.add_transcript(committed, self.capture_time(words[0][0]),
+                                             end=round(self.capture_time(words[-1][1]), 3))
+        self.on_text(committed, partial)
+
+    def capture_time(self, stream_seconds):
+        """Seconds since capture started for a time in the streamer's audio"""
+        position = stream_seconds * TARGET_SAMPLE_RATE
+        i = max(0, bisect.bisect_right(self.piece_stream_starts, position) - 1)
+        if not self.piece_stream_starts:
+            return stream_seconds
+        return self.piece_capture_starts[i] + (position - self.piece_stream_starts[i]) / TARGET_SAMPLE_RATE
+
+    def _record_end_of_utterance(self, captured_at):
+        # Latency from the last speech sample being captured to its text being
+        # committed, assuming capture runs in real time
+        if not self.segmenter.utterance_ends or captured_at is None:
+            return
+        speech_end = self.segmenter.utterance_ends.pop(0)
+        spoken_at = captured_at - (self.samples_in - speech_end) / TARGET_SAMPLE_RATE
+        latency = time.monotonic() - spoken_at
+        self.eou_latencies.append(latency)
+        metrics.observe('end_of_utterance', latency)
+
+    @property
+    def audio_seconds(self):
+        """16 kHz audio handed to the VAD so far this session"""
+        return self.samples_in / TARGET_SAMPLE_RATE
+
+    def stats(self):
+        stats = self.streamer.stats()
+        stats['end_of_utterance_latencies'] = list(self.eou_latencies)
+        stats['decode_seconds'] = self.decode_seconds
+        stats['audio_seconds'] = self.audio_seconds
+        stats['dropped_samples'] = self.audio_buffer.dropped if self.audio_buffer else 0
+        return stats
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Long-session recording for Voice To AI.
+
+SessionRecorder streams captured PCM to disk while dictating, so hours of
+audio never sit in memory. A recording is a directory of fixed-length
+segments of raw int16 samples plus an index.json; optionally each finished
+segment is compressed to FLAC. Because every segment but the last holds
+exactly `segment_samples`, finding the segment and offset for any time is
+arithmetic, not a scan. Text committed while recording is appended to
+transcript.jsonl with its time in the recording.
+
+Recording opens a finished (or interrupted) recording, reads any time range
+through memory maps or FLAC seeks, and can re-transcribe a range with a
+different model.
+
+Usage:
+    python voice_app.py replay recordings/20250101-093000 --start 3600 --end 3900 --model small
+    python recorder.py --help
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+TRANSCRIPT_FILE = 'transcript.jsonl'
+
+
+def _write_json(path, data):
+    # Write then rename so a crash never leaves a truncated index
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class SessionRecorder:
+    def __init__(self, directory, sample_rate, segment_seconds=600, compress=False):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.segment_samples = int(segment_seconds * sample_rate)
+        self.compress = compress
+        self.samples = 0
+        self.index = {
+            'sample_rate': sample_rate,
+            'segment_samples': self.segment_samples,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'segments': [],
+        }
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_written = 0
+        self._compressors = []
+        os.makedirs(directory, exist_ok=True)
+        self._transcript = open(os.path.join(directory, TRANSCRIPT_FILE), 'a')
+        self._open_segment()
+
+    @classmethod
+    def create(cls, root, sample_rate, **options):
+        """New recording in a timestamped directory under `root`"""
+        return cls(os.path.join(root, time.strftime('%Y%m%d-%H%M%S')), sample_rate, **options)
+
+    @property
+    def seconds(self):
+        return self.samples / self.sample_rate
+
+    def _open_segment(self):
+        name = f"segment-{len(self.index['segments']):05d}.raw"
+        self._segment = open(os.path.join(self.directory, name), 'wb')
+        self._segment_written = 0
+        with self._lock:
+            self.index['segments'].append({'file': name, 'format': 'raw'})
+            _write_json(os.path.join(self.directory, INDEX_FILE), self.index)
+
+    def _close_segment(self):
+        self._segment.close()
+        with self._lock:
+            entry = self.index['segments'][-1]
+            entry['samples'] = self._segment_written
+            _write_json(os.path.join(self.directory, INDEX_FILE), self.index)
+        if self.compress:
+            thread = threading.Thread(target=self._compress, args=(entry,), daemon=True)
+            thread.start()
+            self._compressors.append(thread)
+
+    def _compress(self, entry):
+        try:
+            import soundfile
+        except ImportError:
+            print("Recording compression needs the soundfile package; keeping raw segments")
+            self.compress = False
+            return
+        raw_path = os.path.join(self.directory, entry['file'])
+        flac_name = entry['file'].replace('.raw', '.flac')
+        samples = np.fromfile(raw_path, dtype=np.int16)
+        soundfile.write(os.path.join(self.directory, flac_name), samples, self.sample_rate, subtype='PCM_16')
+        with self._lock:
+            entry['file'] = flac_name
+            entry['format'] = 'flac'
+            _write_json(os.path.join(self.directory, INDEX_FILE), self.index)
+        os.unlink(raw_path)
+
+    def write(self, pcm):
+        """Append int16 samples; call from the consumer side, not the audio callback"""
+        pcm = np.asarray(pcm, dtype=np.int16)
+        while pcm.size:
+            room = self.segment_samples - self._segment_written
+            piece, pcm = pcm[:room], pcm[room:]
+            self._segment.write(piece.tobytes())
+            self._segment_written += piece.size
+            self.samples += piece.size
+            if self._segment_written == self.segment_samples:
+                self._close_segment()
+                self._open_segment()
+        self._segment.flush()
+
+    def write_silence(self, samples):
+        """Fill a gap (e.g. dropped audio) so later timestamps stay aligned"""
+        self.write(np.zeros(samples, dtype=np.int16))
+
+    def add_transcript(self, text, time_seconds=None, **fields):
+        record = {'time': round(self.seconds if time_seconds is None else time_seconds, 3), 'text': text}
+        record.update(fields)
+        self._transcript.write(json.dumps(record) + "\n")
+        self._transcript.flush()
+
+    def close(self):
+        if self._segment and not self._segment.closed:
+            self._close_segment()
+        self._transcript.close()
+        for thread in self._compressors:
+            thread.join()
+
+
+class Recording:
+    """Random access to a recording directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.sample_rate = self.index['sample_rate']
+        self.segment_samples = self.index['segment_samples']
+        self.segments = self.index['segments']
+        self._maps = {}
+
+    def _segment_samples(self, i):
+        entry = self.segments[i]
+        if entry.get('samples') is not None:
+            return entry['samples']
+        # Segment still being written, or the session was interrupted
+        return os.path.getsize(os.path.join(self.directory, entry['file'])) // 2
+
+    @property
+    def samples(self):
+        if not self.segments:
+            return 0
+        return (len(self.segments) - 1) * self.segment_samples + self._segment_samples(len(self.segments) - 1)
+
+    @property
+    def duration(self):
+        return self.samples / self.sample_rate
+
+    def _read_segment(self, i, start, end):
+        entry = self.segments[i]
+        path = os.path.join(self.directory, entry['file'])
+        if entry['format'] == 'flac':
+            import soundfile
+            with soundfile.SoundFile(path) as f:
+                f.seek(start)
+                return f.read(end - start, dtype='int16')
+        if i not in self._maps or self._maps[i].size < end:
+            self._maps[i] = np.memmap(path, dtype=np.int16, mode='r')
+        return np.array(self._maps[i][start:end])
+
+    def read(self, start_seconds=0.0, end_seconds=None):
+        """int16 samples for [start, end) seconds; only the segments covering it are touched"""
+        total = self.samples
+        start = max(0, int(start_seconds * self.sample_rate))
+        end = total if end_seconds is None else min(total, int(end_seconds * self.sample_rate))
+        pieces = []
+        position = start
+        while position < end:
+            i = position // self.segment_samples
+            offset = position - i * self.segment_samples
+            count = min(end - position, self.segment_samples - offset)
+            pieces.append(self._read_segment(i, offset, offset + count))
+            position += count
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+
+    def transcript(self):
+        """Text committed during the live session, with recording times"""
+        path = os.path.join(self.directory, TRANSCRIPT_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def transcribe(self, engine, start_seconds=0.0, end_seconds=None, block_seconds=600, **options):
+        """Re-transcribe a time range in blocks; segment times are in recording time"""
+        from transcription import prepare_audio
+        end_seconds = self.duration if end_seconds is None else min(end_seconds, self.duration)
+        results = []
+        block_start = start_seconds
+        while block_start < end_seconds:
+            block_end = min(end_seconds, block_start + block_seconds)
+            audio = prepare_audio(self.read(block_start, block_end), self.sample_rate)
+            segments, info = engine.transcribe_file(audio, **options)
+            for segment in segments:
+                results.append({'start': round(segment['start'] + block_start, 3),
+                                'end': round(segment['end'] + block_start, 3),
+                                'text': segment['text'].strip()})
+            block_start = block_end
+        return results
+
+    def save_transcript(self, segments, name):
+        path = os.path.join(self.directory, name)
+        _write_json(path, segments)
+        return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="voice_app.py replay",
+                                     description="Re-transcribe part of a recorded session")
+    parser.add_argument('recording', help="recording directory (contains index.json)")
+    parser.add_argument('--start', type=float, default=0.0, help="start time in seconds")
+    parser.add_argument('--end', type=float, default=None, help="end time in seconds (default: end)")
+    parser.add_argument('--model', default='base', help="Whisper model size")
+    parser.add_argument('--device', default=None, help="cpu or cuda (default: auto)")
+    parser.add_argument('--compute-type', default=None, help="e.g. int8, float16 (default: by device)")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--beam-size', type=int, default=5)
+    parser.add_argument('--export', default=None, help="also write this range to a WAV file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    recording = Recording(args.recording)
+    end = args.end if args.end is not None else recording.duration
+    print(f"{args.recording}: {recording.duration / 60:.1f} min at {recording.sample_rate} Hz, "
+          f"transcribing {args.start:.0f}s-{end:.0f}s with {args.model}")
+    if args.export:
+        import wave
+        with wave.open(args.export, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(recording.sample_rate)
+            wf.writeframes(recording.read(args.start, end).tobytes())
+
+    from transcription import TranscriptionEngine, resolve_device
+    device, compute_type = resolve_device(args.device, args.compute_type)
+    engine = TranscriptionEngine(args.model, device=device, compute_type=compute_type,
+                                 language=args.language, beam_size=args.beam_size).load(warmup=False)
+    segments = recording.transcribe(engine, args.start, end)
+    for segment in segments:
+        print(f"[{segment['start']:8.1f} - {segment['end']:8.1f}] {segment['text']}")
+    path = recording.save_transcript(segments, f"transcript-{args.model}-{int(args.start)}-{int(end)}.json")
+    print(f"Saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Streaming polyphase resampler for Voice To AI.
+
+Converts captured audio to 16 kHz chunk by chunk with the same anti-aliasing
+FIR filter scipy's resample_poly uses, but carries the filter history across
+chunks. The output matches resampling the whole stream in one go, so chunk
+edges add no error. It costs more CPU than the old per-chunk FFT resample
+(see benchmark_resample.py), roughly 1.5 ms vs 1 ms per second of 48 kHz
+audio, which is small next to decoding.
+"""
+
+from math import gcd
+
+import numpy as np
+
+
+class StreamingResampler:
+    def __init__(self, in_rate, out_rate=16000):
+        g = gcd(int(in_rate), int(out_rate))
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.passthrough = self.up == self.down
+        self.reset()
+        if self.passthrough:
+            return
+
+        # scipy is only needed when the capture rate is not already 16 kHz
+        from scipy.signal import firwin, upfirdn
+        self._upfirdn = upfirdn
+
+        # Same design as scipy.signal.resample_poly (Kaiser window, beta 5)
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        h = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+        # Pad the front so the filter delay is a whole number of output samples
+        pre_pad = self.down - half_len % self.down
+        self.h = np.concatenate([np.zeros(pre_pad), h]).astype(np.float32)
+        self.delay = (half_len + pre_pad) // self.down
+
+    def reset(self):
+        self.history = np.zeros(0, dtype=np.float32)
+        self.history_start = 0   # global index of history[0], always a multiple of down
+        self.total_in = 0
+        self.next_out = 0        # next output index, before delay compensation
+
+    def process(self, audio):
+        """Resample the next chunk of float32 audio; returns what is ready"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.passthrough:
+            return audio
+        self.total_in += audio.size
+        self.history = np.concatenate([self.history, audio])
+        return self._emit((self.total_in - 1) * self.up // self.down)
+
+    def flush(self):
+        """Emit the filter tail at the end of the stream"""
+        if self.passthrough or self.total_in == 0:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self.total_in * self.up // self.down) + self.delay
+        pad = -(-len(self.h) // self.up) + self.down
+        self.history = np.concatenate([self.history, np.zeros(pad, dtype=np.float32)])
+        out = self._emit(expected - 1)
+        self.reset()
+        return out
+
+    def _emit(self, last):
+        # Outputs up to `last` only depend on inputs we already have
+        if last < self.next_out:
+            return np.zeros(0, dtype=np.float32)
+        y = self._upfirdn(self.h, self.history, self.up, self.down)
+        offset = self.history_start * self.up // self.down
+        out = y[self.next_out - offset:last + 1 - offset]
+        first = self.next_out
+        self.next_out = last + 1
+
+        # Keep only the inputs the next output still needs, aligned to `down`
+        needed = max(0, (self.next_out * self.down - len(self.h) + 1) // self.up)
+        needed -= needed % self.down
+        if needed > self.history_start:
+            self.history = self.history[needed - self.history_start:]
+            self.history_start = needed
+
+        # Drop the leading filter delay so output lines up with the input
+        skip = max(0, self.delay - first)
+        return out[skip:].astype(np.float32)
+
+
+def resample_to(audio, in_rate, out_rate=16000):
+    """One-shot resample of a complete buffer"""
+    resampler = StreamingResampler(in_rate, out_rate)
+    return np.concatenate([resampler.process(audio), resampler.flush()])
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
+import json
+import os
 from faster_whisper import WhisperModel
-import torch
+from transcription import detect_device
 
 print("Testing Faster Whisper...")
 try:
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    compute_type = "float16" if device == "cuda" else "int8"
+    device, compute_type = detect_device()
     print(f"Using device: {device}, compute_type: {compute_type}")
-    model = WhisperModel("small", device=device, compute_type=compute_type)
+    # Test the tier picked by `voice_app.py autotune` if there is one
+    tier = {}
+    if os.path.exists('voice_config.json'):
+        with open('voice_config.json') as f:
+            tier = json.load(f).get('whisper_tier', {})
+    model_size = tier.get('model_size', "small")
+    compute_type = tier.get('compute_type', compute_type)
+    print(f"Model: {model_size} ({compute_type})")
+    model = WhisperModel(model_size, device=device, compute_type=compute_type)
     print("✅ Model loaded successfully!")
 except Exception as e:
     print(f"❌ Error loading model: {e}")
\ No newline at end of file
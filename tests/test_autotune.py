@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import pipeline
+from autotune import BacklogMonitor
+from pipeline import DictationPipeline
+from transcription import TARGET_SAMPLE_RATE, prepare_audio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowEngine:
+    """Engine whose every decode takes `decode_seconds` of (fake) wall time"""
+
+    def __init__(self, clock, decode_seconds):
+        self.clock = clock
+        self.decode_seconds = decode_seconds
+
+    def prepare_audio(self, pcm, sample_rate, resampler=None):
+        return prepare_audio(pcm, sample_rate, resampler)
+
+    def transcribe_words(self, audio, initial_prompt=None, **options):
+        self.clock.now += self.decode_seconds
+        return []
+
+
+def run_monitor(monkeypatch, decode_seconds, seconds=120, poll_interval=0.1):
+    """Drive a pipeline in fake real time; return how often the monitor fired"""
+    clock = FakeClock()
+    monkeypatch.setattr(pipeline.time, 'perf_counter', clock)
+    dictation = DictationPipeline(SlowEngine(clock, decode_seconds),
+                                  {'vad': False, 'stream_step_seconds': 1.0})
+    dictation.start(TARGET_SAMPLE_RATE)
+    monitor = BacklogMonitor(limit_seconds=3.0)
+    captured = 0
+    fired = 0
+    while clock.now < seconds:
+        clock.now += poll_interval
+        # Capture keeps running in real time while the consumer is busy
+        due = int(clock.now * TARGET_SAMPLE_RATE) - captured
+        dictation.write(np.zeros(due, dtype=np.int16).tobytes())
+        captured += due
+        dictation.poll()
+        if monitor.update(dictation.backlog_seconds, dictation.decode_seconds, dictation.audio_seconds):
+            fired += 1
+    return fired
+
+
+@pytest.mark.parametrize('decode_seconds', [5.0, 3.0])
+def test_monitor_fires_for_slow_engine(monkeypatch, decode_seconds):
+    assert run_monitor(monkeypatch, decode_seconds) > 0
+
+
+def test_monitor_quiet_for_fast_engine(monkeypatch):
+    assert run_monitor(monkeypatch, 0.2) == 0
+
+
+def test_backlog_held_above_limit():
+    monitor = BacklogMonitor(limit_seconds=3.0, patience=3)
+    assert [monitor.update(4.9) for _ in range(3)] == [False, False, True]
+    # A dip below the limit starts the count again
+    assert [monitor.update(b) for b in (4.9, 1.0, 4.9, 4.9)] == [False, False, False, False]
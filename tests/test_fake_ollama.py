@@ -0,0 +1,48 @@
+import queue
+import time
+
+import pytest
+
+from fake_ollama import FakeOllama
+from ollama_client import ModelDiscovery, OllamaClient
+
+
+@pytest.fixture
+def fake():
+    server = FakeOllama(models=['llama3.2'], load_seconds=0.05, token_delay=0.001).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(fake):
+    client = OllamaClient(fake.url, keep_alive='30m')
+    yield client
+    client.close()
+
+
+def test_warm_makes_model_resident(fake, client):
+    assert client.warm('llama3.2') > 0
+    assert fake.resident['llama3.2'] > time.monotonic() + 25 * 60
+    # Already resident: no second load
+    assert client.warm('llama3.2') == 0
+    assert fake.loads == 1
+
+
+def test_generate_stream_sends_keep_alive(fake, client):
+    reply = "".join(client.generate_stream('llama3.2', "Hello there"))
+    assert reply == fake.reply
+    assert fake.requests[-1]['keep_alive'] == '30m'
+    assert client.last_stats['prompt_eval_count'] == 2
+
+
+def test_discovery_refresh_picks_up_new_model(fake, client):
+    changes = queue.Queue()
+    discovery = ModelDiscovery(client, on_change=changes.put, interval=60).start()
+    try:
+        assert changes.get(timeout=5) == ['llama3.2']
+        fake.models.append('mistral')
+        discovery.refresh()
+        assert changes.get(timeout=5) == ['llama3.2', 'mistral']
+    finally:
+        discovery.stop()
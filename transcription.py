@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Transcription engine for Voice To AI.
+
+Wraps a Faster Whisper model and turns raw PCM captured from the microphone
+into text. Audio is handed to the model as a normalized float32 NumPy buffer,
+so no temporary WAV files are written or decoded per chunk.
+StreamingTranscriber builds live dictation on top of the engine.
+
+faster_whisper (and with it ctranslate2) is imported only when the model is
+loaded, so importing this module is cheap.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from resampler import resample_to
+
+# Faster Whisper expects mono float32 audio at 16 kHz
+TARGET_SAMPLE_RATE = 16000
+
+
+def prepare_audio(pcm, sample_rate, resampler=None):
+    """Convert int16 PCM (bytes or array) into float32 in [-1, 1] at 16 kHz
+
+    Pass the session's StreamingResampler when converting consecutive
+    chunks of one stream so filter state carries across chunk edges.
+    """
+    if isinstance(pcm, (bytes, bytearray, memoryview)):
+        pcm = np.frombuffer(pcm, dtype=np.int16)
+    audio = np.asarray(pcm)
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    else:
+        audio = audio.astype(np.float32, copy=False)
+
+    if resampler is not None:
+        audio = resampler.process(audio)
+    elif sample_rate != TARGET_SAMPLE_RATE and audio.size:
+        audio = resample_to(audio, sample_rate, TARGET_SAMPLE_RATE)
+    return audio
+
+
+# Default compute type for each device
+COMPUTE_TYPES = {"cuda": "float16", "cpu": "int8"}
+
+
+def detect_device():
+    """Pick (device, compute_type) from ctranslate2's CUDA query, without torch"""
+    try:
+        import ctranslate2
+        if ctranslate2.get_cuda_device_count() > 0:
+            return "cuda", COMPUTE_TYPES["cuda"]
+    except Exception:
+        pass
+    return "cpu", COMPUTE_TYPES["cpu"]
+
+
+def resolve_device(device=None, compute_type=None):
+    """(device, compute_type) with unset values filled in, e.g. from --device/--compute-type
+
+    Without a device both come from detect_device(); an explicit device gets
+    its own default compute type.
+    """
+    if device is None:
+        detected_device, detected_type = detect_device()
+        return detected_device, compute_type or detected_type
+    return device, compute_type or COMPUTE_TYPES.get(device, COMPUTE_TYPES["cpu"])
+
+
+class TranscriptionEngine:
+    def __init__(self, model_size="base", device="cpu", compute_type="int8", language="en",
+                 vad_filter=False, cpu_threads=0, num_workers=1, beam_size=5):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads  # 0 lets ctranslate2 decide
+        self.num_workers = num_workers
+        self.language = language
+        self.vad_filter = vad_filter  # faster-whisper's built-in Silero VAD
+        self.beam_size = beam_size
+        self.model = None
+        self.ready = threading.Event()
+        self.load_error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+
+    def load(self, warmup=True):
+        """Load the Whisper model and optionally warm it with a dummy decode"""
+        from faster_whisper import WhisperModel
+
+        start = time.perf_counter()
+        self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type,
+                                  cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+        self.load_seconds = time.perf_counter() - start
+        if warmup:
+            # First decode allocates buffers and initializes kernels; pay it now
+            start = time.perf_counter()
+            segments, info = self.model.transcribe(np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32),
+                                                   language=self.language, beam_size=1)
+            list(segments)
+            self.warmup_seconds = time.perf_counter() - start
+        self.ready.set()
+        return self
+
+    def load_async(self, on_done=None, warmup=True):
+        """Load on a daemon thread; on_done(engine, error) is called when finished"""
+        def run():
+            try:
+                self.load(warmup=warmup)
+            except Exception as e:
+                self.load_error = e
+            if on_done:
+                on_done(self, self.load_error)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def prepare_audio(self, pcm, sample_rate, resampler=None):
+        return prepare_audio(pcm, sample_rate, resampler)
+
+    def _decode_options(self, options):
+        # Engine settings, unless the call overrides them
+        defaults = {'language': self.language, 'vad_filter': self.vad_filter, 'beam_size': self.beam_size}
+        return dict(defaults, **options)
+
+    def transcribe(self, pcm, sample_rate=TARGET_SAMPLE_RATE, **options):
+        """Transcribe a chunk of audio and return the joined segment text"""
+        audio = self.prepare_audio(pcm, sample_rate)
+        if not audio.size:
+            return ""
+        options = self._decode_options(options)
+        segments, info = self.model.transcribe(audio, **options)
+        return " ".join(segment.text for segment in segments).strip()
+
+    def transcribe_words(self, audio, **options):
+        """Decode 16 kHz float32 audio and return [(start, end, word), ...]"""
+        if not audio.size:
+            return []
+        options = self._decode_options(options)
+        segments, info = self.model.transcribe(audio, word_timestamps=True, **options)
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                words.append((word.start, word.end, word.word))
+        return words
+
+    def transcribe_file(self, path, **options):
+        """Transcribe an audio file or 16 kHz float32 array; returns ([{start, end, text}], info)"""
+        options = self._decode_options(options)
+        segments, info = self.model.transcribe(path, **options)
+        return [{'start': s.start, 'end': s.end, 'text': s.text} for s in segments], info
+
+
+def _normalize_word(word):
+    return word.strip().strip('.,!?;:"\'').lower()
+
+
+def _join_words(words):
+    return "".join(w[2] for w in words).strip()
+
+
+class StreamingTranscriber:
+    """Sliding-window streaming transcription with local-agreement commits.
+
+    Audio is appended to an unconfirmed window that is re-decoded on every
+    step. Words that come out the same in two consecutive passes are
+    committed; the rest of the latest pass is reported as a partial
+    hypothesis. Committed text that has left the window is passed to
+    Whisper as `initial_prompt` so each pass keeps the earlier context.
+    """
+
+    def __init__(self, engine, window_seconds=15.0, prompt_chars=200):
+        self.engine = engine
+        self.window_seconds = window_seconds
+        self.prompt_chars = prompt_chars
+        self.reset()
+
+    def reset(self, started_at=None):
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0     # stream time (s) of self.audio[0]
+        self.committed = []         # confirmed words (start, end, word) in stream time
+        self.hypothesis = []        # latest unconfirmed words
+        self.last_committed_end = 0.0
+        self.started_at = started_at
+        self.first_partial_at = None
+        self.first_commit_at = None
+
+    def insert_audio(self, audio):
+        """Append 16 kHz float32 audio to the unconfirmed window"""
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self.audio = np.concatenate([self.audio, audio])
+
+    def prompt(self):
+        """Committed text that is no longer inside the decode window"""
+        text = _join_words([w for w in self.committed if w[1] <= self.buffer_start])
+        return text[-self.prompt_chars:]
+
+    def process(self):
+        """Re-decode the window; return (newly committed text, partial text)"""
+        words = self.engine.transcribe_words(self.audio, initial_prompt=self.prompt() or None)
+        words = [(s + self.buffer_start, e + self.buffer_start, w) for s, e, w in words]
+        # Drop words already committed from an earlier pass
+        words = [w for w in words if w[0] >= self.last_committed_end - 0.05]
+        words = self._skip_repeated_tail(words)
+
+        newly_committed = []
+        while words and self.hypothesis and \
+                _normalize_word(words[0][2]) == _normalize_word(self.hypothesis[0][2]):
+            newly_committed.append(words.pop(0))
+            self.hypothesis.pop(0)
+        self.hypothesis = words
+
+        now = time.monotonic()
+        if newly_committed:
+            self.committed.extend(newly_committed)
+            self.last_committed_end = newly_committed[-1][1]
+            if self.first_commit_at is None:
+                self.first_commit_at = now
+        if (newly_committed or words) and self.first_partial_at is None:
+            self.first_partial_at = now
+
+        forced = self._trim()
+        if forced and self.first_commit_at is None:
+            self.first_commit_at = now
+        return _join_words(newly_committed + forced), _join_words(self.hypothesis)
+
+    def finish(self):
+        """Commit whatever is left of the hypothesis and return it"""
+        remaining = self.hypothesis
+        self.committed.extend(remaining)
+        self.hypothesis = []
+        if remaining:
+            self.last_committed_end = remaining[-1][1]
+            if self.first_commit_at is None:
+                self.first_commit_at = time.monotonic()
+        return _join_words(remaining)
+
+    def flush(self):
+        """End of utterance: decode once more, commit everything, clear the window"""
+        committed, partial = self.process() if self.audio.size else ("", "")
+        rest = self.finish()
+        self.buffer_start += self.audio.size / TARGET_SAMPLE_RATE
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.last_committed_end = max(self.last_committed_end, self.buffer_start)
+        return " ".join(t for t in (committed, rest) if t)
+
+    def committed_text(self):
+        return _join_words(self.committed)
+
+    def stats(self):
+        """Time-to-first-word measurements (seconds from stream start)"""
+        def since_start(t):
+            return None if t is None or self.started_at is None else t - self.started_at
+        return {
+            'time_to_first_partial': since_start(self.first_partial_at),
+            'time_to_first_commit': since_start(self.first_commit_at),
+        }
+
+    def _skip_repeated_tail(self, words):
+        # Whisper sometimes repeats the last committed words at the start of a
+        # pass; drop the longest n-gram (up to 5) that matches the committed tail
+        if not self.committed or not words or words[0][0] - self.last_committed_end > 1.0:
+            return words
+        for n in range(min(5, len(self.committed), len(words)), 0, -1):
+            tail = [_normalize_word(w[2]) for w in self.committed[-n:]]
+            head = [_normalize_word(w[2]) for w in words[:n]]
+            if tail == head:
+                return words[n:]
+        return words
+
+    def _trim(self):
+        # Keep the window bounded: cut at the end of the last committed word,
+        # or keep only the second half if that cut would not bring the window
+        # under the cap (silence, or a hypothesis that never settles).
+        # Returns the words committed because they are leaving the window.
+        limit = int(self.window_seconds * TARGET_SAMPLE_RATE)
+        if self.audio.size <= limit:
+            return []
+        # Work in samples: buffer_start is a truncated sample offset, so it can
+        # sit just below last_committed_end without any audio left to cut
+        cut_samples = max(0, round((self.last_committed_end - self.buffer_start) * TARGET_SAMPLE_RATE))
+        forced = []
+        if self.audio.size - cut_samples > limit:
+            cut_samples = self.audio.size - limit // 2
+            cut = self.buffer_start + cut_samples / TARGET_SAMPLE_RATE
+            # Words about to leave the window can never be confirmed again
+            forced = [w for w in self.hypothesis if w[1] <= cut]
+            if forced:
+                self.committed.extend(forced)
+                self.hypothesis = self.hypothesis[len(forced):]
+                self.last_committed_end = forced[-1][1]
+        self.audio = self.audio[cut_samples:]
+        self.buffer_start += cut_samples / TARGET_SAMPLE_RATE
+        return forced
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Local streaming transcription server for Voice To AI.
+
+Exposes one warm Faster Whisper model over a localhost WebSocket so the
+Electron app and other tools can share it. Each connection is a dictation
+session with its own ring buffer, resampler, VAD and streaming state; model
+calls from all sessions go through a single scheduler thread.
+
+Protocol (one session per connection):
+    client -> {"type": "start", "sample_rate": 48000}   optional, default 16000
+    client -> binary frames of mono int16 PCM
+    client -> {"type": "stop"}                          finish and get the rest
+    server -> {"type": "ready"}
+    server -> {"type": "partial", "text": "..."}        unstable tail, replaced each time
+    server -> {"type": "final", "text": "..."}          committed text, appended
+    server -> {"type": "done", "text": "...", "stats": {...}}
+    server -> {"type": "error", "message": "..."}
+
+Usage:
+    python voice_app.py serve --port 8765
+    python transcription_server.py --help
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from batched_transcription import BatchedTranscriber
+from pipeline import DictationPipeline
+from transcription import TranscriptionEngine, TARGET_SAMPLE_RATE, resolve_device
+
+DEFAULT_PORT = 8765
+
+
+class DecodeScheduler:
+    """Runs model work from every session on a small thread pool
+
+    A session waits for its own job before submitting the next one, so jobs
+    are served in arrival order and a busy session cannot starve the others.
+    With one worker (the default) model calls are fully serialized; with a
+    BatchedTranscriber, up to a batch's worth of sessions decode at once and
+    their windows are batched together.
+    """
+
+    def __init__(self, workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='decode')
+        self.pending = 0
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        metrics.observe_size('scheduler_queue', self.pending)
+        submitted = time.perf_counter()
+
+        def job():
+            metrics.observe('scheduler_wait', time.perf_counter() - submitted)
+            return fn(*args)
+
+        try:
+            return await loop.run_in_executor(self.executor, job)
+        finally:
+            self.pending -= 1
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class TranscriptionServer:
+    def __init__(self, engine, config=None, host='127.0.0.1', port=DEFAULT_PORT, poll_interval=0.1,
+                 batcher=None):
+        self.engine = engine
+        self.config = config or {}
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.batcher = batcher  # BatchedTranscriber, or None to decode one window at a time
+        self.scheduler = DecodeScheduler(workers=batcher.max_batch_size if batcher else 1)
+        self.sessions = 0
+
+    async def serve(self):
+        import websockets
+        loop = asyncio.get_running_loop()
+        if self.engine.model is None:
+            print("Loading Whisper model...")
+            await loop.run_in_executor(None, self.engine.load)
+        async with websockets.serve(self.handle, self.host, self.port, max_size=2 ** 22):
+            print(f"Transcription server listening on ws://{self.host}:{self.port}")
+            await asyncio.Future()  # run until cancelled
+
+    async def handle(self, websocket):
+        import websockets
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def emit(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        def on_text(committed, partial):
+            if committed:
+                emit({'type': 'final', 'text': committed})
+            emit({'type': 'partial', 'text': partial})
+
+        engine = self.batcher.session() if self.batcher else self.engine
+        pipeline = DictationPipeline(engine, self.config, on_text=on_text,
+                                     on_error=lambda e: emit({'type': 'error', 'message': str(e)}))
+        self.sessions += 1
+        metrics.observe_size('server_sessions', self.sessions)
+        sender = asyncio.create_task(self._send_events(websocket, events))
+        poller = None
+        try:
+            message = await websocket.recv()
+            sample_rate = TARGET_SAMPLE_RATE
+            if isinstance(message, str):
+                sample_rate = int(json.loads(message).get('sample_rate', TARGET_SAMPLE_RATE))
+                message = None
+            pipeline.start(sample_rate)
+            if message is not None:
+                pipeline.write(message)
+            events.put_nowait({'type': 'ready'})
+
+            poller = asyncio.create_task(self._poll(pipeline))
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    pipeline.write(message)
+                elif json.loads(message).get('type') == 'stop':
+                    break
+
+            # Let an in-flight decode finish before the final flush
+            pipeline.capturing = False
+            await poller
+            stats = await self.scheduler.run(pipeline.finish)
+            events.put_nowait({'type': 'done', 'text': pipeline.text.strip(), 'stats': stats})
+        except websockets.ConnectionClosed:
+            pass
+        except (ValueError, TypeError) as e:
+            events.put_nowait({'type': 'error', 'message': f"Bad message: {e}"})
+        finally:
+            pipeline.capturing = False
+            if poller:
+                await poller
+            events.put_nowait(None)
+            await sender
+            self.sessions -= 1
+
+    async def _poll(self, pipeline):
+        while pipeline.capturing:
+            await asyncio.sleep(self.poll_interval)
+            if pipeline.audio_buffer.written > pipeline.processed:
+                await self.scheduler.run(pipeline.poll)
+
+    async def _send_events(self, websocket, events):
+        import websockets
+        while True:
+            event = await events.get()
+            if event is None:
+                return
+            try:
+                await websocket.send(json.dumps(event))
+            except websockets.ConnectionClosed:
+                return
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="voice_app.py serve",
+                                     description="Serve streaming transcription over a local WebSocket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model', default='base', help="Whisper model size")
+    parser.add_argument('--device', default=None, help="cpu or cuda (default: auto)")
+    parser.add_argument('--compute-type', default=None, help="e.g. int8, float16 (default: by device)")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--cpu-threads', type=int, default=0)
+    parser.add_argument('--step', type=float, default=1.0, help="seconds of new speech between decodes")
+    parser.add_argument('--no-vad', action='store_true', help="decode everything, not just speech")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="decode up to this many sessions together (needs faster-whisper >= 1.1)")
+    parser.add_argument('--batch-wait', type=float, default=50,
+                        help="milliseconds to wait for more sessions before decoding a batch")
+    parser.add_argument('--metrics-port', type=int, default=0, help="serve Prometheus metrics on this port")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    device, compute_type = resolve_device(args.device, args.compute_type)
+    if args.metrics_port:
+        metrics.enable(port=args.metrics_port)
+    engine = TranscriptionEngine(args.model, device=device, compute_type=compute_type,
+                                 language=args.language, cpu_threads=args.cpu_threads)
+    config = {'stream_step_seconds': args.step, 'vad': not args.no_vad}
+    batcher = None
+    if args.batch_size > 1:
+        batcher = BatchedTranscriber(engine, max_batch_size=args.batch_size, max_wait=args.batch_wait / 1000)
+    server = TranscriptionServer(engine, config, host=args.host, port=args.port, batcher=batcher)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.scheduler.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Out-of-process transcription worker for Voice To AI.
+
+The Whisper model lives in a separate process so inference never competes
+with the Tk main loop for the GIL. Audio is passed through a shared-memory
+buffer and results come back over a queue. TranscriptionWorker exposes the
+same interface as TranscriptionEngine, so StreamingTranscriber and the GUI
+can use either one, and it restarts the worker if it dies.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from transcription import TranscriptionEngine, TARGET_SAMPLE_RATE, prepare_audio
+
+
+def _worker_main(settings, shm_name, shm_samples, requests, results):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    audio_slot = np.ndarray((shm_samples,), dtype=np.float32, buffer=shm.buf)
+    try:
+        engine = TranscriptionEngine(**settings)
+        engine.load(warmup=True)
+        results.put(('ready', engine.load_seconds, engine.warmup_seconds))
+    except Exception as e:
+        results.put(('error', f"{type(e).__name__}: {e}"))
+        shm.close()
+        return
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, method, length, audio, options = request
+        try:
+            if audio is None:
+                audio = audio_slot[:length]
+            if method == 'transcribe_words':
+                result = engine.transcribe_words(audio, **options)
+            else:
+                result = engine.transcribe(audio, TARGET_SAMPLE_RATE, **options)
+            results.put(('result', request_id, result))
+        except Exception as e:
+            results.put(('failed', request_id, f"{type(e).__name__}: {e}"))
+    del audio_slot
+    shm.close()
+
+
+class TranscriptionWorker:
+    def __init__(self, model_size="base", device="cpu", compute_type="int8", language="en",
+                 vad_filter=False, cpu_threads=0, num_workers=1, beam_size=5, max_seconds=60):
+        self.settings = {
+            'model_size': model_size,
+            'device': device,
+            'compute_type': compute_type,
+            'language': language,
+            'vad_filter': vad_filter,
+            'cpu_threads': cpu_threads,
+            'num_workers': num_workers,
+            'beam_size': beam_size,
+        }
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.language = language
+        self.beam_size = beam_size
+        self.ready = threading.Event()
+        self.load_error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.restarts = 0
+
+        self._ctx = mp.get_context('spawn')  # never fork the Tk process
+        self._shm_samples = int(max_seconds * TARGET_SAMPLE_RATE)
+        self._shm = shared_memory.SharedMemory(create=True, size=self._shm_samples * 4)
+        self._audio_slot = np.ndarray((self._shm_samples,), dtype=np.float32, buffer=self._shm.buf)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.process = None
+
+    def prepare_audio(self, pcm, sample_rate, resampler=None):
+        # Audio conditioning stays on the capture side
+        return prepare_audio(pcm, sample_rate, resampler)
+
+    def load(self, warmup=True):
+        """Start the worker process and wait until its model is loaded"""
+        self._start()
+        return self
+
+    def load_async(self, on_done=None, warmup=True):
+        def run():
+            try:
+                self._start()
+            except Exception as e:
+                self.load_error = e
+            if on_done:
+                on_done(self, self.load_error)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def _start(self):
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self.process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.settings, self._shm.name, self._shm_samples, self._requests, self._results),
+            daemon=True)
+        self.process.start()
+
+        while True:
+            try:
+                message = self._results.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError(f"Transcription worker exited with code {self.process.exitcode}")
+        if message[0] == 'error':
+            raise RuntimeError(message[1])
+        self.load_seconds, self.warmup_seconds = message[1], message[2]
+        self.ready.set()
+
+    def _restart(self):
+        self.ready.clear()
+        self.restarts += 1
+        print(f"Transcription worker died (exit code {self.process.exitcode}), restarting...")
+        self._start()
+
+    def _call(self, method, audio, options):
+        with self._lock:
+            for attempt in range(2):
+                self._next_id += 1
+                request_id = self._next_id
+                if audio.size <= self._shm_samples:
+                    self._audio_slot[:audio.size] = audio
+                    self._requests.put((request_id, method, audio.size, None, options))
+                else:
+                    # Too long for the shared slot; send it through the queue
+                    self._requests.put((request_id, method, audio.size, audio, options))
+
+                while True:
+                    try:
+                        message = self._results.get(timeout=0.5)
+                    except queue.Empty:
+                        if self.process.is_alive():
+                            continue
+                        break
+                    kind, reply_id, payload = message
+                    if reply_id != request_id:
+                        continue  # stale reply from before a restart
+                    if kind == 'failed':
+                        raise RuntimeError(payload)
+                    return payload
+
+                # The worker crashed mid-request: restart and retry once
+                self._restart()
+            raise RuntimeError("Transcription worker keeps crashing")
+
+    def transcribe(self, pcm, sample_rate=TARGET_SAMPLE_RATE, **options):
+        audio = self.prepare_audio(pcm, sample_rate)
+        if not audio.size:
+            return ""
+        return self._call('transcribe', audio, options)
+
+    def transcribe_words(self, audio, **options):
+        if not audio.size:
+            return []
+        return self._call('transcribe_words', audio, options)
+
+    def close(self):
+        if self.process and self.process.is_alive():
+            self._requests.put(None)
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.terminate()
+        del self._audio_slot
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Text-to-speech for Voice To AI.
+
+Pluggable synthesis backends that return audio in memory, an LRU cache of
+synthesized phrases (optionally persisted to disk), and a pygame player that
+plays straight from the buffer. The default backend is espeak-ng, which runs
+locally, so speech works without network access and never touches temp files.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+
+
+class TTSError(Exception):
+    pass
+
+
+class SynthesizedAudio:
+    def __init__(self, data, format):
+        self.data = data      # encoded audio bytes
+        self.format = format  # 'wav' or 'mp3'
+
+    def __len__(self):
+        return len(self.data)
+
+
+class TTSBackend:
+    """Interface for synthesis engines: synthesize(text) -> SynthesizedAudio"""
+
+    name = None
+
+    def __init__(self, voice=None, rate=None):
+        self.voice = voice
+        self.rate = rate
+
+    def available(self):
+        return True
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+
+class EspeakBackend(TTSBackend):
+    """Offline synthesis with espeak-ng (or espeak), WAV written to stdout"""
+
+    name = 'espeak'
+
+    def __init__(self, voice='en', rate=175):
+        super().__init__(voice or 'en', rate or 175)
+        self.binary = shutil.which('espeak-ng') or shutil.which('espeak')
+
+    def available(self):
+        return self.binary is not None
+
+    def synthesize(self, text):
+        if not self.binary:
+            raise TTSError("espeak-ng is not installed")
+        # Text goes through stdin so lines like "- First item" are not parsed as options
+        result = subprocess.run([self.binary, '--stdout', '--stdin', '-v', self.voice, '-s', str(self.rate)],
+                                input=text.encode(), capture_output=True, timeout=30)
+        if result.returncode != 0 or not result.stdout:
+            raise TTSError(result.stderr.decode(errors='replace').strip() or "espeak failed")
+        return SynthesizedAudio(result.stdout, 'wav')
+
+
+class GTTSBackend(TTSBackend):
+    """Google TTS (needs network); MP3 is written to memory"""
+
+    name = 'gtts'
+
+    def __init__(self, voice='en', rate=None):
+        super().__init__(voice or 'en', rate)
+
+    def synthesize(self, text):
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.voice, slow=False).write_to_fp(buffer)
+        return SynthesizedAudio(buffer.getvalue(), 'mp3')
+
+
+BACKENDS = {
+    EspeakBackend.name: EspeakBackend,
+    GTTSBackend.name: GTTSBackend,
+}
+
+
+def create_backend(name='espeak', voice=None, rate=None):
+    if name not in BACKENDS:
+        raise TTSError(f"Unknown TTS engine: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](voice=voice, rate=rate)
+
+
+class TTSCache:
+    """LRU cache of synthesized audio keyed by (engine, voice, text)
+
+    Memory use is capped at `max_bytes`. With `directory` set, entries are
+    also written there and found again after a restart; the directory is
+    pruned oldest-first once it grows past `max_disk_bytes`.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, directory=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key, format):
+        digest = hashlib.sha1("\0".join(str(k) for k in key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.{format}")
+
+    def get(self, key):
+        with self._lock:
+            audio = self.entries.get(key)
+            if audio is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return audio
+        if self.directory:
+            for format in ('wav', 'mp3'):
+                path = self._path(key, format)
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        audio = SynthesizedAudio(f.read(), format)
+                    os.utime(path)
+                    self._remember(key, audio)
+                    with self._lock:
+                        self.hits += 1
+                    return audio
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, audio):
+        self._remember(key, audio)
+        if self.directory:
+            try:
+                with open(self._path(key, audio.format), 'wb') as f:
+                    f.write(audio.data)
+                self._prune_disk()
+            except OSError as e:
+                print(f"TTS cache write failed: {e}")
+
+    def _remember(self, key, audio):
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = audio
+            self.size += len(audio)
+            while self.size > self.max_bytes:
+                old_key, old_audio = self.entries.popitem(last=False)
+                self.size -= len(old_audio)
+
+    def _prune_disk(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        files = [(os.path.getmtime(path), os.path.getsize(path), path) for path in files]
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            os.unlink(path)
+            total -= size
+
+
+class TextToSpeech:
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache
+
+    def synthesize(self, text):
+        key = (self.backend.name, self.backend.voice, self.backend.rate, text)
+        if self.cache:
+            audio = self.cache.get(key)
+            if audio is not None:
+                return audio
+        audio = self.backend.synthesize(text)
+        if self.cache:
+            self.cache.put(key, audio)
+        return audio
+
+
+class AudioPlayer:
+    """Plays SynthesizedAudio from memory with pygame (imported on first use)"""
+
+    def __init__(self):
+        self.pygame = None
+
+    def init(self):
+        if self.pygame is None:
+            import pygame
+            pygame.mixer.init()
+            self.pygame = pygame
+        return self.pygame
+
+    def play(self, audio, keep_playing=lambda: True):
+        """Play until finished or keep_playing() turns false"""
+        pygame = self.init()
+        if audio.format == 'wav':
+            sound = pygame.mixer.Sound(file=io.BytesIO(audio.data))
+            channel = sound.play()
+            while channel.get_busy() and keep_playing():
+                pygame.time.wait(20)
+            sound.stop()
+        else:
+            pygame.mixer.music.load(io.BytesIO(audio.data), audio.format)
+            pygame.mixer.music.play()
+            while pygame.mixer.music.get_busy() and keep_playing():
+                pygame.time.wait(20)
+            pygame.mixer.music.stop()
+
+    def stop(self):
+        if self.pygame:
+            self.pygame.mixer.stop()
+            self.pygame.mixer.music.stop()
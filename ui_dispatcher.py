@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Coalescing UI update dispatcher for Voice To AI.
+
+Tk may only be touched from its own thread, but transcription, Ollama
+streaming and TTS all run on worker threads. They post updates here instead;
+a Tk timer drains the queue once per frame (33 ms by default) and applies
+everything pending in one pass:
+
+- status(): only the newest message of a frame is shown
+- append(): consecutive appends to one text area become a single insert
+- set_partial(): only the newest partial hypothesis is drawn, replacing the
+  tagged region at the end of the text instead of redrawing the rest
+- clear() and call() keep their order relative to the text updates
+"""
+
+import queue
+import tkinter as tk
+
+import metrics
+
+
+class _TextTarget:
+    def __init__(self, widget, partial_tag):
+        self.widget = widget
+        self.partial_tag = partial_tag
+        self.reset()
+
+    def reset(self):
+        self.cleared = False
+        self.appended = []
+        self.partial = None  # None leaves the current partial region alone
+
+    @property
+    def dirty(self):
+        return self.cleared or self.appended or self.partial is not None
+
+    def flush(self):
+        widget = self.widget
+        if self.cleared:
+            widget.delete('1.0', tk.END)
+        ranges = widget.tag_ranges(self.partial_tag) if self.partial_tag else ()
+        if self.partial is not None and ranges:
+            widget.delete(ranges[0], ranges[-1])
+            ranges = ()
+        if self.appended:
+            # Committed text goes before a partial region that is being kept
+            widget.insert(ranges[0] if ranges else tk.END, "".join(self.appended))
+        if self.partial:
+            widget.insert(tk.END, self.partial, self.partial_tag)
+        widget.see(tk.END)
+        self.reset()
+
+
+class UIDispatcher:
+    def __init__(self, root, frame_ms=33):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.queue = queue.SimpleQueue()
+        self.targets = {}
+        self.status_label = None
+        self.running = False
+
+    def register_text(self, name, widget, partial_tag=None):
+        self.targets[name] = _TextTarget(widget, partial_tag)
+
+    def register_status(self, label):
+        self.status_label = label
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.root.after(self.frame_ms, self._drain)
+
+    def stop(self):
+        self.running = False
+
+    # Thread-safe producers
+
+    def status(self, message, color=None):
+        self.queue.put(('status', message, color))
+
+    def append(self, name, text):
+        self.queue.put(('append', name, text))
+
+    def set_partial(self, name, text):
+        self.queue.put(('partial', name, text))
+
+    def clear(self, name):
+        self.queue.put(('clear', name, None))
+
+    def call(self, fn, *args):
+        self.queue.put(('call', fn, args))
+
+    # Tk thread
+
+    def _drain(self):
+        if not self.running:
+            return
+        status = None
+        count = 0
+        try:
+            while True:
+                kind, a, b = self.queue.get_nowait()
+                count += 1
+                if kind == 'status':
+                    status = a
+                elif kind == 'call':
+                    self._flush_text()
+                    a(*b)
+                else:
+                    target = self.targets[a]
+                    if kind == 'append':
+                        target.appended.append(b)
+                    elif kind == 'partial':
+                        target.partial = b
+                    else:
+                        target.reset()
+                        target.cleared = True
+        except queue.Empty:
+            pass
+        except Exception as e:
+            print(f"UI update failed: {e}")
+        if count:
+            metrics.observe_size('ui_updates_per_frame', count)
+            self._flush_text()
+            if status is not None and self.status_label is not None:
+                self.status_label.config(text=status)
+        self.root.after(self.frame_ms, self._drain)
+
+    def _flush_text(self):
+        for target in self.targets.values():
+            if target.dirty:
+                target.flush()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection for Voice To AI.
+
+A cheap frame-level energy / zero-crossing detector that decides which
+captured audio is worth sending to Whisper, and a segmenter that cuts the
+stream into utterances at speech endpoints instead of wall-clock ticks.
+"""
+
+import numpy as np
+
+from transcription import TARGET_SAMPLE_RATE
+
+
+class EnergyVAD:
+    """Classify fixed-size frames of 16 kHz float32 audio as speech or silence.
+
+    A frame is speech when its RMS level clears an adaptive noise floor by
+    `margin_db` (and the absolute `threshold_db`). Quieter frames with a
+    fricative-like zero-crossing rate also count, so "s"/"f" sounds at the
+    edges of words are not clipped. The noise floor follows the level of
+    non-speech frames, and is raised to the quietest frame of the last
+    `floor_window_ms` when even that is above it, so steady background
+    noise loud enough to pass as speech is learned too.
+    """
+
+    def __init__(self, frame_ms=30, threshold_db=-45.0, margin_db=10.0,
+                 zcr_range=(0.1, 0.5), floor_adapt=0.05, floor_window_ms=5000):
+        self.frame_size = int(TARGET_SAMPLE_RATE * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.zcr_range = zcr_range
+        self.floor_adapt = floor_adapt
+        self.noise_db = threshold_db - margin_db
+        # Ring of recent frame levels for the minimum-statistics floor
+        self.levels = np.zeros(max(1, int(floor_window_ms / frame_ms)))
+        self.level_pos = 0
+        self.levels_full = False
+
+    def frame_features(self, frames):
+        """Return (rms_db, zcr) arrays for a (n, frame_size) block of frames"""
+        rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+        rms_db = 20 * np.log10(rms)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+        return rms_db, zcr
+
+    def is_speech(self, frames):
+        """Return a boolean per frame for a (n, frame_size) block"""
+        rms_db, zcr = self.frame_features(frames)
+        decisions = np.zeros(len(frames), dtype=bool)
+        for i in range(len(frames)):
+            self.levels[self.level_pos] = rms_db[i]
+            self.level_pos = (self.level_pos + 1) % self.levels.size
+            self.levels_full = self.levels_full or self.level_pos == 0
+            # Speech has pauses; a window with no frame near the floor is noise
+            if self.levels_full:
+                self.noise_db = max(self.noise_db, self.levels.min())
+            loud = max(self.threshold_db, self.noise_db + self.margin_db)
+            if rms_db[i] >= loud:
+                decisions[i] = True
+            elif rms_db[i] >= loud - self.margin_db / 2 and \
+                    self.zcr_range[0] <= zcr[i] <= self.zcr_range[1]:
+                decisions[i] = True
+            else:
+                self.noise_db += self.floor_adapt * (rms_db[i] - self.noise_db)
+        return decisions
+
+
+class UtteranceSegmenter:
+    """Turn a stream of audio into speech chunks and utterance endpoints.
+
+    `push(audio)` returns a list of (speech_audio, ended, start) pieces: the
+    audio to transcribe (with `pre_roll_ms` of lead-in before speech onset),
+    whether that piece finishes an utterance, either because `silence_ms`
+    of trailing silence was seen or it reached `max_utterance_s`, and the
+    stream position (in 16 kHz samples) of the piece's first sample. For every
+    finished utterance the stream position (in 16 kHz samples) of its last
+    speech frame is appended to `utterance_ends`.
+    """
+
+    def __init__(self, vad=None, silence_ms=500, pre_roll_ms=200,
+                 min_speech_ms=90, max_utterance_s=30.0):
+        self.vad = vad or EnergyVAD()
+        frame_ms = 1000 * self.vad.frame_size / TARGET_SAMPLE_RATE
+        self.silence_frames = max(1, int(silence_ms / frame_ms))
+        self.pre_roll_frames = int(pre_roll_ms / frame_ms)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.max_utterance_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.reset()
+
+    def reset(self):
+        self.pending = np.zeros(0, dtype=np.float32)  # leftover < 1 frame
+        self.pre_roll = []
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.utterance_frames = 0
+        self.samples_seen = 0          # samples consumed into frames so far
+        self.last_speech_end = 0
+        self.utterance_ends = []
+
+    def push(self, audio):
+        audio = np.concatenate([self.pending, audio]) if self.pending.size else audio
+        size = self.vad.frame_size
+        n = audio.size // size
+        self.pending = audio[n * size:].copy()
+        if n == 0:
+            return []
+
+        frames = audio[:n * size].reshape(n, size)
+        decisions = self.vad.is_speech(frames)
+        pieces = []
+        out = []
+        out_start = 0
+        for frame, speech in zip(frames, decisions):
+            frame_start = self.samples_seen
+            self.samples_seen += size
+            if speech:
+                self.last_speech_end = self.samples_seen
+            if not self.in_speech:
+                self.pre_roll.append(frame)
+                self.speech_run = self.speech_run + 1 if speech else 0
+                if self.speech_run >= self.min_speech_frames:
+                    # Onset: emit the lead-in together with the onset frames
+                    out_start = frame_start - (len(self.pre_roll) - 1) * size
+                    out.extend(self.pre_roll)
+                    self.utterance_frames = len(self.pre_roll)
+                    self.pre_roll = []
+                    self.in_speech = True
+                    self.silence_run = 0
+                else:
+                    keep = self.pre_roll_frames + self.min_speech_frames
+                    del self.pre_roll[:-keep]
+                continue
+
+            if not out:
+                out_start = frame_start
+            out.append(frame)
+            self.utterance_frames += 1
+            self.silence_run = 0 if speech else self.silence_run + 1
+            if self.silence_run >= self.silence_frames or \
+                    self.utterance_frames >= self.max_utterance_frames:
+                pieces.append((np.concatenate(out), True, out_start))
+                self.utterance_ends.append(self.last_speech_end)
+                out = []
+                self.in_speech = False
+                self.speech_run = 0
+                self.utterance_frames = 0
+        if out:
+            pieces.append((np.concatenate(out), False, out_start))
+        return pieces
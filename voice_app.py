@@ -6,26 +6,45 @@ A standalone GUI app for voice recognition that integrates with OpenCode.
 Features a simple interface with start/stop buttons and automatic clipboard copying.
 """
 
+import sys
+import time
+_START = time.perf_counter()  # for startup timing logs
+
+# Headless subcommands run before the GUI imports below, so they work without
+# Tk, pyperclip or PyAudio. The module runs as __main__ (like python -m), so
+# the worker processes it spawns import it rather than this GUI script.
+SUBCOMMANDS = {
+    'batch': 'batch_transcribe',        # batch transcription, no Tk window
+    'autotune': 'autotune',             # measure Whisper tiers, store the best one
+    'serve': 'transcription_server',    # WebSocket server sharing one model
+    'replay': 'recorder',               # re-transcribe part of a recorded session
+}
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+    import runpy
+    module = SUBCOMMANDS[sys.argv.pop(1)]
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+    sys.exit(0)
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import pyperclip
 import threading
-import time
+import queue
 import os
 import json
 import pyaudio
-import numpy as np
-import tempfile
-import wave
-from faster_whisper import WhisperModel
-from scipy.signal import resample
-import torch
 import requests
-import pyttsx3
-from gtts import gTTS
-import pygame
-import os
-from PIL import Image, ImageTk
+# Heavy modules (faster_whisper, scipy, pygame, gTTS) are imported lazily
+from transcription import TranscriptionEngine, detect_device
+from transcription_worker import TranscriptionWorker
+from ollama_client import OllamaClient, OllamaError, SentenceSplitter, ModelDiscovery, Conversation, DEFAULT_KEEP_ALIVE
+from tts import TextToSpeech, TTSCache, AudioPlayer, create_backend
+from pipeline import DictationPipeline
+from ui_dispatcher import UIDispatcher
+from recorder import SessionRecorder
+from audio_devices import DeviceManager
+from autotune import AutotuneProcess, BacklogMonitor, default_tier, next_tier
+import metrics
 
 class VoiceApp:
     def __init__(self, root):
@@ -34,52 +53,246 @@ class VoiceApp:
         self.root.geometry("900x800")
         self.root.configure(bg='#000033')  # Dark blue gradient approximation
         self.root.resizable(True, True)
+        # Every widget update from a worker thread goes through this queue
+        self.ui = UIDispatcher(root, frame_ms=33)
 
         # Config
         self.config_file = 'voice_config.json'
         self.config = self.load_config()
 
-        # Audio devices
-        self.audio = pyaudio.PyAudio()
-        self.microphones = self.get_microphones()
-        self.selected_mic_index = self.config.get('microphone_index', 0)
-
-        # Speech recognition with Faster Whisper
-        print("Loading Whisper model... (this may take a minute on first run)")
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
+        # Optional per-stage timing; instrumentation is a no-op unless enabled
+        if self.config.get('metrics', False):
+            metrics.enable(port=self.config.get('metrics_port', 9464),
+                           log_path=self.config.get('metrics_log'),
+                           log_interval=self.config.get('metrics_log_interval', 10))
+
+        # Audio devices: supported rates are probed once and cached by a stable
+        # device id; the list is re-enumerated in the background on hot-plug
+        self.devices = DeviceManager(cache=self.config.setdefault('audio_devices', {}),
+                                     on_change=lambda devices: self.ui.call(self.on_devices_changed, devices),
+                                     poll_seconds=self.config.get('device_poll_seconds', 5))
+        self.microphones = self.devices.devices
+        self.selected_mic_id = self.config.get('microphone_id')
+        if self.devices.find(self.selected_mic_id) is None and self.microphones:
+            # Older configs stored a position in the menu
+            index = min(self.config.get('microphone_index', 0), len(self.microphones) - 1)
+            self.selected_mic_id = self.microphones[index].id
+        self.start_pressed = None
+        self.first_frame_latency = None
+
+        # Speech recognition with Faster Whisper (loaded in the background after the GUI is up)
+        device, compute_type = detect_device()
         print(f"Using device: {device}, compute_type: {compute_type}")
-        self.model = WhisperModel("base", device=device, compute_type=compute_type)  # Base model for better accuracy
-        print("Model loaded!")
-
-        # Text-to-speech with gTTS and pygame
-        pygame.mixer.init()
+        # Model tier (size, compute type, beam size) comes from autotune when
+        # it has been run on this device; otherwise the base model
+        self.tier = self.config.get('whisper_tier')
+        if not self.tier or self.tier.get('device') != device:
+            self.tier = default_tier(device, compute_type, self.config.get('cpu_threads', 0))
+        print(f"Whisper tier: {self.tier['model_size']}/{self.tier['compute_type']} beam {self.tier['beam_size']}")
+        self.engine = self.create_engine(self.tier)
+        # Capture -> resample -> VAD -> streaming transcription
+        self.pipeline = DictationPipeline(self.engine, self.config, on_text=self.commit_text,
+                                          on_error=lambda e: self.ui.append('transcript', f"[Error: {e}]\n"),
+                                          on_engine_replaced=self.on_engine_replaced)
+        # In autotune mode the tier is measured once and stepped down whenever
+        # transcription keeps falling further behind capture
+        self.autotune = self.config.get('autotune', False)
+        self.backlog_monitor = BacklogMonitor(limit_seconds=self.config.get('backlog_limit_seconds', 3.0))
+        self.switching_engine = False
+        self.closing = False
+
+        # Text-to-speech, offline by default, synthesized and played in memory.
+        # Sentences go through two queues so the next one is synthesized while
+        # the current one plays; stale items are skipped by generation number.
+        backend = create_backend(self.config.get('tts_engine', 'espeak'),
+                                 voice=self.config.get('tts_voice'), rate=self.config.get('tts_rate'))
+        if not backend.available():
+            print(f"TTS engine '{backend.name}' is not available - install espeak-ng or set tts_engine")
+        self.tts = TextToSpeech(backend, TTSCache(max_bytes=self.config.get('tts_cache_mb', 32) * 1024 * 1024,
+                                                  directory=self.config.get('tts_cache_dir')))
+        self.player = AudioPlayer()  # pygame mixer is initialized on first use
         self.tts_playing = False
+        self.tts_generation = 0
+        self.spoken_generation = 0
+        self.response_started = None
+        self.sentence_queue = queue.Queue()
+        self.playback_queue = queue.Queue()
+        threading.Thread(target=self.tts_synth_loop, daemon=True).start()
+        threading.Thread(target=self.tts_playback_loop, daemon=True).start()
 
         # Ollama models
-        self.ollama_models = self.get_ollama_models()
-        self.selected_model = self.config.get('selected_model', "llama3.2" if "llama3.2" in self.ollama_models else (self.ollama_models[0] if self.ollama_models else "llama3.2"))
+        # Discovered in the background and refreshed periodically; keep_alive
+        # keeps the selected model loaded in Ollama between dictations
+        self.ollama = OllamaClient(keep_alive=self.config.get('ollama_keep_alive', DEFAULT_KEEP_ALIVE))
+        self.ollama_models = []
+        self.selected_model = self.config.get('selected_model', "llama3.2")
+        self.warming_model = None
+        # Follow-up questions continue the conversation through Ollama's context
+        self.conversation = None
+        if self.config.get('conversation', True):
+            self.conversation = Conversation(self.ollama,
+                                             max_context_tokens=self.config.get('conversation_max_tokens', 4096),
+                                             keep_turns=self.config.get('conversation_keep_turns', 3))
         self.is_listening = False
         self.current_text = ""
         self.audio_stream = None
-        self.audio_frames = []
 
         # GUI elements
         self.create_gui()
+        self.ui.start()
 
         # Bind close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-    def get_ollama_models(self):
-        try:
-            response = requests.get('http://localhost:11434/api/tags', timeout=5)
-            if response.status_code == 200:
-                models = [model['name'] for model in response.json()['models']]
-                return models
-            else:
-                return []
-        except:
-            return []
+        self.root.after_idle(self.on_first_paint)
+        self.model_discovery = ModelDiscovery(
+            self.ollama, on_change=lambda models: self.ui.call(self.on_ollama_models, models),
+            interval=self.config.get('ollama_refresh_seconds', 30)).start()
+        self.devices.start_watching()
+        print("Loading Whisper model in background... (this may take a minute on first run)")
+        self.update_status("⏳ Loading speech model...")
+        self.engine.load_async(on_done=lambda engine, error: self.ui.call(self.on_model_ready, error))
+        if self.autotune and 'whisper_tier' not in self.config:
+            threading.Thread(target=self.run_autotune, daemon=True).start()
+
+    def on_first_paint(self):
+        print(f"Startup: GUI ready after {time.perf_counter() - _START:.2f}s")
+
+    def on_model_ready(self, error):
+        if error:
+            print(f"Error loading Whisper model: {error}")
+            self.update_status(f"Model error: {str(error)[:50]}", "red")
+            return
+        print(f"Startup: model ready after {time.perf_counter() - _START:.2f}s "
+              f"(load {self.engine.load_seconds:.2f}s, warm-up {self.engine.warmup_seconds:.2f}s)")
+        if self.is_listening:
+            self.update_status("🎙️ Listening... (real-time)", "#00aa00")
+        else:
+            self.update_status("Ready", "black")
+
+    def create_engine(self, tier):
+        # By default the model runs in a worker process so inference never blocks Tk
+        engine_class = TranscriptionWorker if self.config.get('transcription_process', True) else TranscriptionEngine
+        return engine_class(tier['model_size'], device=tier['device'], compute_type=tier['compute_type'],
+                            vad_filter=self.config.get('whisper_vad_filter', False),
+                            cpu_threads=tier.get('cpu_threads', 0),
+                            num_workers=self.config.get('num_workers', 1),
+                            beam_size=tier['beam_size'])
+
+    def run_autotune(self):
+        """Measure tiers in a separate process while the app is idle
+
+        Measuring waits for the startup model load and for dictation to stop,
+        and is cancelled and retried later if dictation starts, so the RTFs
+        are not skewed by other work.
+        """
+        job = None
+        while not self.closing:
+            busy = self.is_listening or self.switching_engine or not self.engine.ready.is_set()
+            if job is None:
+                if self.engine.load_error:
+                    return
+                if not busy:
+                    print("Autotune: measuring Whisper tiers in a background process...")
+                    job = AutotuneProcess(self.tier['device'], self.config.get('autotune_target_rtf', 0.3),
+                                          (self.tier.get('cpu_threads', 0),)).start()
+                else:
+                    time.sleep(1.0)
+                continue
+            if busy:
+                print("Autotune: paused while dictating; will measure again when idle")
+                job.cancel()
+                job = None
+                continue
+            try:
+                tier = job.result(timeout=0.5)
+                break
+            except queue.Empty:
+                continue
+            except Exception as e:
+                print(f"Autotune failed: {e}")
+                return
+        else:
+            if job:
+                job.cancel()
+            return
+        if not tier:
+            return
+        same = all(tier[k] == self.tier[k] for k in ('model_size', 'compute_type', 'beam_size'))
+        if same:
+            self.tier = tier
+            self.config['whisper_tier'] = tier
+            self.save_config()
+        else:
+            self.switch_engine(tier)
+
+    def downgrade_engine(self):
+        tier = next_tier(self.tier)
+        if tier is None:
+            print("Transcription is falling behind and there is no faster tier to switch to")
+            return
+        print(f"Transcription is falling behind; switching to {tier['model_size']}/{tier['compute_type']} "
+              f"beam {tier['beam_size']}")
+        self.switch_engine(tier)
+
+    def switch_engine(self, tier):
+        """Load a new tier in the background and hand it to the pipeline when ready"""
+        if self.switching_engine:
+            return
+        self.switching_engine = True
+        engine = self.create_engine(tier)
+
+        def loaded(engine, error):
+            self.switching_engine = False
+            if error:
+                print(f"Could not load {tier['model_size']}: {error}")
+                return
+            self.tier = tier
+            self.config['whisper_tier'] = tier
+            self.save_config()
+            self.pipeline.replace_engine(engine)
+
+        engine.load_async(on_done=loaded)
+
+    def on_engine_replaced(self, old):
+        self.engine = self.pipeline.engine
+        self.backlog_monitor.reset()
+        if isinstance(old, TranscriptionWorker):
+            old.close()
+
+    def on_ollama_models(self, models):
+        """Refresh the model menu after discovery found a different list"""
+        self.ollama_models = models
+        menu = self.model_menu['menu']
+        menu.delete(0, 'end')
+        for model in models or ["No models found"]:
+            menu.add_command(label=model, command=tk._setit(self.model_var, model))
+        if not models:
+            print("Ollama not reachable or has no models")
+            return
+        if self.selected_model not in models:
+            self.selected_model = "llama3.2" if "llama3.2" in models else models[0]
+        if self.model_var.get() != self.selected_model:
+            self.model_var.set(self.selected_model)  # warms it through on_model_change
+
+    def warm_model(self):
+        """Load the selected model in Ollama ahead of the first prompt"""
+        model = self.selected_model
+        if model not in self.ollama_models or self.warming_model == model:
+            return
+        self.warming_model = model
+
+        def run():
+            try:
+                load_seconds = self.ollama.warm(model)
+                if load_seconds:
+                    print(f"Warmed {model} in {load_seconds:.2f}s")
+            except Exception as e:
+                print(f"Could not warm {model}: {e}")
+            finally:
+                self.warming_model = None
+
+        threading.Thread(target=run, daemon=True).start()
 
     def load_config(self):
         if os.path.exists(self.config_file):
@@ -91,10 +304,11 @@ class VoiceApp:
         return {}
 
     def save_config(self):
-        config = {
-            'microphone_index': self.selected_mic_index,
+        config = dict(self.config)
+        config.update({
+            'microphone_id': self.selected_mic_id,
             'selected_model': self.selected_model
-        }
+        })
         try:
             with open(self.config_file, 'w') as f:
                 json.dump(config, f)
@@ -102,28 +316,37 @@ class VoiceApp:
             pass
 
     def on_close(self):
+        self.closing = True
         self.save_config()
-        self.audio.terminate()
+        self.ui.stop()
+        self.model_discovery.stop()
+        self.ollama.close()
+        self.devices.close()
+        if isinstance(self.engine, TranscriptionWorker):
+            self.engine.close()
         self.root.destroy()
 
-    def get_microphones(self):
-        microphones = []
-        for i in range(self.audio.get_device_count()):
-            info = self.audio.get_device_info_by_index(i)
-            max_input = info.get('maxInputChannels', 0)
-            if isinstance(max_input, (int, float)) and max_input > 0:
-                microphones.append(f"{info.get('name')} (Index: {i})")
-        return microphones
-
-    def get_mic_device_index(self, mic_string):
-        import re
-        match = re.search(r'Index: (\d+)', mic_string)
-        return int(match.group(1)) if match else 0
+    def on_devices_changed(self, devices):
+        """Refresh the microphone menu after a device was plugged in or removed"""
+        self.microphones = devices
+        menu = self.mic_menu['menu']
+        menu.delete(0, 'end')
+        for device in devices:
+            menu.add_command(label=device.label, command=tk._setit(self.mic_var, device.label, self.on_mic_change))
+        selected = self.devices.find(self.selected_mic_id)
+        if selected is None and devices:
+            selected = devices[0]
+            self.selected_mic_id = selected.id
+            self.update_status(f"Microphone disconnected - using {selected.label}", "orange")
+        self.mic_var.set(selected.label if selected else "No microphones found")
 
     def audio_callback(self, in_data, frame_count, time_info, status):
         """Callback for audio stream"""
         if self.is_listening:
-            self.audio_frames.append(in_data)
+            if self.first_frame_latency is None and self.start_pressed is not None:
+                self.first_frame_latency = time.perf_counter() - self.start_pressed
+                metrics.observe('start_to_first_frame', self.first_frame_latency)
+            self.pipeline.write(in_data)
         return (in_data, pyaudio.paContinue)
 
     def create_gui(self):
@@ -148,11 +371,14 @@ class VoiceApp:
 
         ttk.Label(mic_frame, text="Microphone:").pack(side='left')
         self.mic_var = tk.StringVar()
-        self.mic_menu = tk.OptionMenu(mic_frame, self.mic_var, *self.microphones, command=self.on_mic_change)
+        self.mic_menu = tk.OptionMenu(mic_frame, self.mic_var,
+                                      *([d.label for d in self.microphones] or ["No microphones found"]),
+                                      command=self.on_mic_change)
         self.mic_menu.pack(side='left', padx=(10, 0), fill='x', expand=True)
         self.mic_menu.config(bg='#000033', fg='white', activebackground='#000055', activeforeground='white', highlightbackground='#000033', highlightcolor='#000033')
-        if self.microphones:
-            self.mic_var.set(self.microphones[self.selected_mic_index])
+        selected = self.devices.find(self.selected_mic_id)
+        if selected:
+            self.mic_var.set(selected.label)
 
         # AI Model selection
         model_frame = ttk.Frame(self.root)
@@ -160,16 +386,15 @@ class VoiceApp:
 
         ttk.Label(model_frame, text="AI Model:").pack(side='left')
         self.model_var = tk.StringVar()
-        self.model_menu = tk.OptionMenu(model_frame, self.model_var, *self.ollama_models if self.ollama_models else ["No models found"])
+        self.model_menu = tk.OptionMenu(model_frame, self.model_var, "No models found")  # filled in by discovery
         self.model_menu.pack(side='left', padx=(10, 0), fill='x', expand=True)
         self.model_menu.config(bg='#000033', fg='white', activebackground='#000055', activeforeground='white', highlightbackground='#000033', highlightcolor='#000033')
-        if self.ollama_models:
-            self.model_var.set(self.selected_model)
         self.model_var.trace('w', self.on_model_change)
 
         # Status label
         self.status_label = ttk.Label(self.root, text="Ready", font=('Helvetica', 12))
         self.status_label.pack(pady=10)
+        self.ui.register_status(self.status_label)
 
         # Text area
         text_frame = ttk.Frame(self.root)
@@ -180,6 +405,7 @@ class VoiceApp:
                                                   bg='#000022', fg='white', insertbackground='white',
                                                   font=('Consolas', 10))
         self.text_area.pack(fill='x', expand=False)
+        self.text_area.tag_configure('partial', foreground='#8888aa')
 
         # AI Response area
         ai_frame = ttk.Frame(self.root)
@@ -190,6 +416,8 @@ class VoiceApp:
                                                      bg='#000022', fg='white', insertbackground='white',
                                                      font=('Consolas', 10))
         self.ai_text_area.pack(fill='x', expand=False)
+        self.ui.register_text('transcript', self.text_area, partial_tag='partial')
+        self.ui.register_text('ai', self.ai_text_area)
 
         # Buttons
         button_frame = ttk.Frame(self.root)
@@ -219,23 +447,30 @@ class VoiceApp:
                                        command=self.clear_text)
         self.clear_button.pack(side='left', padx=5)
 
+        self.new_chat_button = ttk.Button(button_frame, text="💬 New Conversation",
+                                          command=self.new_conversation)
+        self.new_chat_button.pack(side='left', padx=5)
+
 
 
     def on_mic_change(self, value):
-        try:
-            self.selected_mic_index = self.microphones.index(value)
-            self.save_config()
-            self.update_status(f"Selected: {value.split(' (')[0]}")
-        except ValueError:
-            pass
+        for device in self.microphones:
+            if device.label == value:
+                self.selected_mic_id = device.id
+                self.save_config()
+                self.update_status(f"Selected: {device.name}")
+                return
 
     def on_model_change(self, *args):
+        if self.model_var.get() not in self.ollama_models:
+            return
         self.selected_model = self.model_var.get()
         self.update_status(f"AI Model: {self.selected_model}")
+        self.warm_model()
 
     def update_status(self, message, color='black'):
-        self.status_label.config(text=message)
-        self.root.update_idletasks()
+        # Safe from any thread; shown on the next UI frame
+        self.ui.status(message, color)
 
     def start_dictation(self):
         if not self.microphones:
@@ -243,13 +478,16 @@ class VoiceApp:
             return
 
         self.is_listening = True
+        self.start_pressed = time.perf_counter()
+        self.first_frame_latency = None
         self.current_text = ""
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(tk.END, "🎙️ Listening... Speak now!\n\n")
+        self.ui.clear('transcript')
+        self.ui.append('transcript', "🎙️ Listening... Speak now!\n\n")
 
         self.start_button.config(state='disabled')
         self.stop_button.config(state='normal')
         self.update_status("🎙️ Listening...", "#00aa00")
+        self.warm_model()  # load the AI model while the user is still speaking
 
         # Start listening in background thread
         threading.Thread(target=self.listen_loop, daemon=True).start()
@@ -290,31 +528,47 @@ class VoiceApp:
         try:
             # Check if Ollama is running
             if not self.ollama_models:
+                self.model_discovery.refresh()
                 self.update_status("Ollama not running - start with 'ollama serve'", "red")
                 return
 
             self.update_status("🤖 Querying AI...", "#ffaa00")
-            # Query Ollama
-            response = requests.post('http://localhost:11434/api/generate',
-                                   json={
-                                       "model": self.selected_model,
-                                       "prompt": user_text,
-                                       "stream": False
-                                   },
-                                   timeout=60)
-            if response.status_code == 200:
-                ai_response = response.json()['response'].strip()
-                if ai_response:
-                    # Display AI response
-                    self.ai_text_area.delete(1.0, tk.END)
-                    self.ai_text_area.insert(tk.END, ai_response)
-                    # Speak the response with gTTS
-                    self.speak_with_gtts(ai_response)
-                    self.update_status("🤖 AI responded!", "#00aa00")
-                else:
-                    self.update_status("AI gave empty response", "orange")
+            generation = self.new_speech_generation()
+            self.response_started = time.perf_counter()
+            self.ui.clear('ai')
+
+            # Stream the response: show tokens as they arrive and speak each
+            # sentence as soon as it is complete
+            splitter = SentenceSplitter()
+            ai_response = ""
+            if self.conversation:
+                tokens = self.conversation.ask(self.selected_model, user_text)
             else:
-                self.update_status(f"Ollama error: {response.status_code}", "red")
+                tokens = self.ollama.generate_stream(self.selected_model, user_text)
+            for token in tokens:
+                if not ai_response:
+                    metrics.observe('ollama_first_token', time.perf_counter() - self.response_started)
+                ai_response += token
+                self.ui.append('ai', token)
+                for sentence in splitter.feed(token):
+                    self.speak_async(sentence, generation)
+            rest = splitter.flush()
+            if rest:
+                self.speak_async(rest, generation)
+            metrics.observe('ollama_generate', time.perf_counter() - self.response_started)
+            stats = self.ollama.last_stats
+            if stats.get('prompt_eval_duration'):
+                metrics.observe('ollama_prompt_eval', stats['prompt_eval_duration'] / 1e9)
+            if self.conversation:
+                print(f"Turn {self.conversation.turn_count}: evaluated {stats.get('prompt_eval_count')} "
+                      f"prompt tokens, context {len(stats.get('context') or [])} tokens")
+
+            if ai_response.strip():
+                self.update_status("🤖 AI responded!", "#00aa00")
+            else:
+                self.update_status("AI gave empty response", "orange")
+        except OllamaError as e:
+            self.update_status(f"Ollama error: {e.status_code}", "red")
         except requests.exceptions.Timeout:
             self.update_status("AI timeout - model may be slow", "red")
         except requests.exceptions.ConnectionError:
@@ -322,161 +576,157 @@ class VoiceApp:
         except Exception as e:
             self.update_status(f"AI error: {str(e)[:50]}", "red")
 
-    def speak_with_gtts(self, text):
+    def new_speech_generation(self):
+        """Start a new response; anything still queued for speech is dropped"""
+        self.tts_generation += 1
+        return self.tts_generation
+
+    def speak_async(self, text, generation):
+        self.sentence_queue.put((generation, text))
+        metrics.observe_size('tts_sentence_queue', self.sentence_queue.qsize())
+
+    def tts_synth_loop(self):
+        while True:
+            generation, text = self.sentence_queue.get()
+            if generation != self.tts_generation:
+                continue
+            try:
+                with metrics.timer('tts_synthesize'):
+                    audio = self.tts.synthesize(text)
+            except Exception as e:
+                print(f"TTS error: {e}")
+                continue
+            self.playback_queue.put((generation, audio))
+            metrics.observe_size('tts_playback_queue', self.playback_queue.qsize())
+
+    def tts_playback_loop(self):
+        while True:
+            generation, audio = self.playback_queue.get()
+            try:
+                if generation == self.tts_generation:
+                    if generation != self.spoken_generation and self.response_started:
+                        self.spoken_generation = generation
+                        first_audio = time.perf_counter() - self.response_started
+                        metrics.observe('time_to_first_audio', first_audio)
+                        print(f"Time to first audio: {first_audio:.2f}s")
+                    self.play_audio(audio)
+            except Exception as e:
+                print(f"TTS error: {e}")
+
+    def play_audio(self, audio):
+        self.tts_playing = True
         try:
-            self.tts_playing = True
-            tts = gTTS(text=text, lang='en', slow=False)
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            tts.save(temp_file.name)
-            pygame.mixer.music.load(temp_file.name)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy() and self.tts_playing:
-                pygame.time.wait(100)
-            pygame.mixer.music.stop()
-            os.unlink(temp_file.name)
-        except Exception as e:
-            print(f"TTS error: {e}")
+            with metrics.timer('tts_playback'):
+                self.player.play(audio, keep_playing=lambda: self.tts_playing)
         finally:
             self.tts_playing = False
 
     def stop_tts(self):
+        self.new_speech_generation()
         self.tts_playing = False
-        pygame.mixer.music.stop()
+        self.player.stop()
         self.update_status("TTS stopped", "orange")
 
+    def new_conversation(self):
+        if self.conversation:
+            self.conversation.reset()
+        self.ui.clear('ai')
+        self.update_status("New conversation", "black")
+
     def clear_text(self):
-        self.text_area.delete(1.0, tk.END)
-        self.ai_text_area.delete(1.0, tk.END)
+        self.ui.clear('transcript')
+        self.ui.clear('ai')
         self.current_text = ""
         self.update_status("Ready", "black")
 
     def listen_loop(self):
         try:
-            device_index = self.get_mic_device_index(self.microphones[self.selected_mic_index])
-
-            # Start audio stream - try different sample rates
-            self.audio_frames = []
-            sample_rates = [48000, 44100, 32000, 22050, 16000, 8000]  # Try common rates
-
-            for rate in sample_rates:
-                try:
-                    self.audio_stream = self.audio.open(
-                        format=pyaudio.paInt16,
-                        channels=1,
-                        rate=rate,
-                        input=True,
-                        input_device_index=device_index,
-                        frames_per_buffer=1024,
-                        stream_callback=self.audio_callback
-                    )
-                    self.sample_rate = rate
-                    break
-                except Exception as e:
-                    print(f"Failed to open stream at {rate} Hz: {e}")
-                    continue
-            else:
-                raise Exception("Could not open audio stream at any supported sample rate")
+            device = self.devices.find(self.selected_mic_id)
+            if device is None:
+                raise Exception("Selected microphone is not connected")
+
+            # Open at the device's best cached rate (native 16 kHz skips
+            # resampling); the ring is preallocated before callbacks start
+            self.audio_stream, rate = self.devices.open_input(device, self.audio_callback,
+                                                              before_open=self.pipeline.start)
+
+            # Optionally keep the raw audio of the whole session on disk
+            if self.config.get('record_sessions', False):
+                self.pipeline.recorder = SessionRecorder.create(
+                    self.config.get('recordings_dir', 'recordings'), rate,
+                    segment_seconds=self.config.get('record_segment_seconds', 600),
+                    compress=self.config.get('record_compress', False))
+                print(f"Recording to {self.pipeline.recorder.directory}")
 
             self.audio_stream.start_stream()
-            self.root.after(0, lambda: self.update_status("🎙️ Listening... (real-time)", "#00aa00"))
-
-            processed_frames = 0
-            chunk_duration = 2  # seconds for faster real-time display with good accuracy
+            if self.engine.ready.is_set():
+                self.update_status("🎙️ Listening... (real-time)", "#00aa00")
+            else:
+                self.update_status("⏳ Buffering audio while the model loads...", "#ffaa00")
 
-            # Real-time transcription loop
+            # Streaming transcription loop; poll often so endpoints flush promptly
             while self.is_listening:
-                time.sleep(chunk_duration)
-
-                # Check if we have new frames to process
-                if len(self.audio_frames) > processed_frames:
-                    chunk_frames = self.audio_frames[processed_frames:]
-                    processed_frames = len(self.audio_frames)
-
-                    # Process this chunk
-                    self.root.after(0, lambda: self.update_status("🔍 Recognizing...", "#ffaa00"))
-                    try:
-                        # Convert chunk to numpy and resample
-                        audio_data = np.frombuffer(b''.join(chunk_frames), dtype=np.int16)
-                        if self.sample_rate != 16000:
-                            num_samples = len(audio_data)
-                            target_samples = int(num_samples * 16000 / self.sample_rate)
-                            audio_data = resample(audio_data, target_samples).astype(np.int16)
-
-                        # Save chunk to temp WAV
-                        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                            temp_filename = temp_file.name
-
-                            with wave.open(temp_filename, 'wb') as wf:
-                                wf.setnchannels(1)
-                                wf.setsampwidth(2)
-                                wf.setframerate(16000)
-                                wf.writeframes(audio_data.tobytes())
-
-                        # Transcribe chunk
-                        segments, info = self.model.transcribe(temp_filename, language="en")
-                        text = " ".join(segment.text for segment in segments).strip()
-
-                        os.unlink(temp_filename)
-
-                        if text:
-                            self.current_text += text + " "
-                            self.root.after(0, self.update_transcript, text)
-                            self.root.after(0, lambda: self.update_status("🎙️ Listening... (real-time)", "#00aa00"))
-                        else:
-                            self.root.after(0, lambda: self.update_status("🎙️ Listening... (real-time)", "#00aa00"))
-
-                    except Exception as e:
-                        self.root.after(0, self.update_transcript, f"[Error: {e}]")
-                        self.root.after(0, lambda: self.update_status("🎙️ Listening... (real-time)", "#00aa00"))
+                time.sleep(0.1)
+                if not self.engine.ready.is_set():
+                    # Keep capturing into the ring (and recording) until the model is loaded
+                    if self.engine.load_error:
+                        raise self.engine.load_error
+                    self.pipeline.record()
+                    continue
+
+                # Transcribe new samples
+                with metrics.timer('poll'):
+                    self.pipeline.poll()
+                if self.autotune and self.backlog_monitor.update(self.pipeline.backlog_seconds,
+                                                                 self.pipeline.decode_seconds,
+                                                                 self.pipeline.audio_seconds):
+                    self.downgrade_engine()
 
             # Stop recording
             if self.audio_stream:
-                self.audio_stream.stop_stream()
-                self.audio_stream.close()
+                self.devices.close_stream(self.audio_stream)
                 self.audio_stream = None
+            if self.first_frame_latency is not None:
+                print(f"Start to first captured frame: {self.first_frame_latency * 1000:.0f} ms")
+
+            # Process any remaining samples and commit the last hypothesis
+            if not self.engine.ready.is_set():
+                self.update_status("⏳ Waiting for the model...", "#ffaa00")
+                while not self.engine.ready.wait(0.1):
+                    if self.engine.load_error:
+                        raise self.engine.load_error
+            self.update_status("🔍 Finalizing...", "#ffaa00")
+            stats = self.pipeline.finish()
+            if self.pipeline.recorder:
+                recorder, self.pipeline.recorder = self.pipeline.recorder, None
+                recorder.close()
+                print(f"Saved {recorder.seconds / 60:.1f} min of audio to {recorder.directory}")
+            if stats['time_to_first_partial'] is not None:
+                print(f"Time to first word: {stats['time_to_first_partial']:.2f}s")
+            if stats['time_to_first_commit'] is not None:
+                print(f"Time to first committed word: {stats['time_to_first_commit']:.2f}s")
+            if stats['end_of_utterance_latencies']:
+                latencies = stats['end_of_utterance_latencies']
+                print(f"End-of-utterance latency: {sum(latencies) / len(latencies):.2f}s average")
+            if stats['dropped_samples']:
+                print(f"Transcription fell behind: dropped {stats['dropped_samples']} samples")
 
-            # Process any remaining frames
-            if len(self.audio_frames) > processed_frames:
-                remaining_frames = self.audio_frames[processed_frames:]
-                self.root.after(0, lambda: self.update_status("🔍 Finalizing...", "#ffaa00"))
-                try:
-                    audio_data = np.frombuffer(b''.join(remaining_frames), dtype=np.int16)
-                    if self.sample_rate != 16000:
-                        num_samples = len(audio_data)
-                        target_samples = int(num_samples * 16000 / self.sample_rate)
-                        audio_data = resample(audio_data, target_samples).astype(np.int16)
-
-                    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                        temp_filename = temp_file.name
-
-                        with wave.open(temp_filename, 'wb') as wf:
-                            wf.setnchannels(1)
-                            wf.setsampwidth(2)
-                            wf.setframerate(16000)
-                            wf.writeframes(audio_data.tobytes())
-
-                    segments, info = self.model.transcribe(temp_filename, language="en")
-                    text = " ".join(segment.text for segment in segments).strip()
-
-                    os.unlink(temp_filename)
-
-                    if text:
-                        self.current_text += text + " "
-                        self.root.after(0, self.update_transcript, text)
-
-                except Exception as e:
-                    self.root.after(0, self.update_transcript, f"[Error: {e}]")
-
-            self.root.after(0, lambda: self.update_status("Ready", "black"))
+            self.update_status("Ready", "black")
 
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Recognition error: {e}"))
-            self.root.after(0, self.stop_dictation)
-
-    def update_transcript(self, text):
-        self.text_area.insert(tk.END, f"{text}\n")
-        self.text_area.see(tk.END)
-        self.root.update_idletasks()
+            if self.audio_stream:
+                self.devices.close_stream(self.audio_stream)
+                self.audio_stream = None
+            self.ui.call(messagebox.showerror, "Error", f"Recognition error: {e}")
+            self.ui.call(self.stop_dictation)
+
+    def commit_text(self, committed, partial):
+        if committed:
+            self.current_text += committed + " "
+        # Committed text is appended; the partial hypothesis after it is replaced
+        if committed:
+            self.ui.append('transcript', committed + " ")
+        self.ui.set_partial('transcript', partial)
 
 def main():
     try: